@@ -0,0 +1,138 @@
+"""Structured audit log written off the request path.
+
+`event("fix", document=..., gid=..., affected=1)` puts one record on a bounded
+queue and returns at once. A daemon thread drains the queue in batches and
+appends JSON lines to AUDIT_FILE (default "-", i.e. stdout, so `docker logs`
+keeps showing them). If the queue is full (AUDIT_QUEUE_SIZE) a record is
+dropped and counted rather than blocking a request. Every record carries
+"ts" (local ISO time) and "event"; the rest are the caller's fields.
+
+Events: "checkpoints" (check.evaluate_checkpoints), "status_check"
+(check.check_document_status) and "fix" (set.update, compare-and-set and
+batch fixes in main.py).
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+_STOP = object()
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(bytes(value))} bytes>"
+    return str(value)
+
+
+class AuditLog:
+    def __init__(self, path="-", queue_size=10000, batch=256):
+        self.path = path or "-"
+        self.batch = max(int(batch), 1)
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                    self._thread.start()
+
+    def event(self, kind, **fields):
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "event": kind}
+        record.update(fields)
+        self.write(record)
+
+    def write(self, record):
+        """Queue one JSON-serializable dict as is (no "ts"/"event" added)."""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _open(self):
+        if self.path == "-":
+            return sys.stdout, False
+        return open(self.path, "a", encoding="utf-8"), True
+
+    def _run(self):
+        try:
+            out, owned = self._open()
+        except Exception as e:
+            logging.error("Audit log unavailable (%s): %s", self.path, e)
+            return
+        try:
+            while True:
+                records = [self._queue.get()]
+                while len(records) < self.batch:
+                    try:
+                        records.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(r is _STOP for r in records)
+                lines = [json.dumps(r, ensure_ascii=False, default=_default) for r in records if r is not _STOP]
+                if lines:
+                    try:
+                        out.write("\n".join(lines) + "\n")
+                        out.flush()
+                    except Exception as e:
+                        logging.error("Audit write failed: %s", e)
+                for _ in records:
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            if owned:
+                out.close()
+
+    def flush(self, timeout=5.0):
+        """Wait until queued records are written (best effort, up to `timeout`)."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write what is queued and stop the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+log = AuditLog(
+    path=os.getenv("AUDIT_FILE", "-"),
+    queue_size=_env_int("AUDIT_QUEUE_SIZE", 10000),
+)
+
+
+def event(kind, **fields):
+    log.event(kind, **fields)
+
+
+def close():
+    log.close()
@@ -2,19 +2,8 @@ SELECT
     ADCode,
     Status,
     d.fDocumentGID,
-    UID,
-    AuthenticationCode,
-    MarkID,
-    ProviderName,
-    QRCode,
-    InvoiceURL,
     t.ESDCreated,
     t.ESUCreated,
-    CurrencyNetValue,
-    CurrencyTotalValue,
-    CurrencyVATValue,
-    fCashAccountTypeCode,
-    AuthorizationID,
     StatusText
 
 FROM ESFIEinvoiceProviderDetails d
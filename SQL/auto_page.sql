@@ -0,0 +1,32 @@
+/*
+ * Copyright (c) Ioannis E. Kommas 2025. All Rights Reserved
+ */
+
+-- Keyset-paginated candidate list (oldest first within the lookback window).
+-- after_created / after_gid are the last row of the previous page (NULL for
+-- the first page). WITH TIES keeps every liquidity line of the last document
+-- on the same page so the cursor never splits a document.
+
+SELECT TOP (:page_size) WITH TIES
+    ADCode,
+    Status,
+    d.fDocumentGID,
+    t.ESDCreated,
+    t.ESUCreated,
+    StatusText
+
+FROM ESFIEinvoiceProviderDetails d
+JOIN ESFIDocumentTrade t
+    ON d.fdocumentgid = t.GID
+LEFT JOIN ESFILineLiquidityAccount L
+    ON t.GID = L.fDocumentGID
+LEFT JOIN ESFICashAccount AS CA
+            ON L.fLiquidityAccountGID = CA.GID
+WHERE Status in (0,2) AND ProviderName = 'Impact'
+    AND t.ESDCreated >= :since
+    AND (
+        :after_created IS NULL
+        OR t.ESDCreated > CAST(:after_created AS datetime)
+        OR (t.ESDCreated = CAST(:after_created AS datetime) AND d.fDocumentGID > :after_gid)
+    )
+ORDER BY t.ESDCreated, d.fDocumentGID
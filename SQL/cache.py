@@ -0,0 +1,156 @@
+"""In-process TTL cache with stale-while-revalidate refresh.
+
+Used for query results that many requests share (e.g. the auto.sql candidate
+list). Within `ttl` seconds a cached value is returned as is. Between `ttl`
+and `stale_ttl` the stale value is returned immediately and a single refresh
+is started in the background on the DB executor. Older entries (or misses)
+are loaded inline. `invalidate()` drops entries explicitly, e.g. after a fix.
+
+`ByteLRU` is a plain LRU for binary payloads (QR images) bounded by the total
+number of bytes it holds rather than by entry count.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from SQL import executor
+
+
+class TTLCache:
+    def __init__(self, ttl=30.0, stale_ttl=300.0):
+        self.ttl = float(ttl)
+        self.stale_ttl = max(float(stale_ttl), self.ttl)
+        self._entries = {}  # key -> (value, stored_at)
+        self._refreshing = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def peek(self, key):
+        """Return (value, age_seconds) of the cached entry, or (None, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+        return entry[0], time.monotonic() - entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+
+    def invalidate(self, key=None):
+        """Drop one entry (or all); in-flight refreshes will not repopulate them."""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _load(self, key, loader, generation):
+        value = loader()
+        # Never cache failures (None) and never resurrect invalidated entries
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (value, time.monotonic())
+        return value
+
+    def _refresh(self, key, loader, generation):
+        try:
+            self._load(key, loader, generation)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _lookup(self, key):
+        """Return (value, state, generation) where state is fresh/stale/miss."""
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, "miss", generation
+            value, stored_at = entry
+            age = now - stored_at
+            if age < self.ttl:
+                return value, "fresh", generation
+            if age < self.stale_ttl:
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    return value, "revalidate", generation
+                return value, "stale", generation
+            return None, "miss", generation
+
+    def get(self, key, loader):
+        """Synchronous get: return the cached value or call `loader()`."""
+        if not self.enabled:
+            return loader()
+        value, state, generation = self._lookup(key)
+        if state == "miss":
+            return self._load(key, loader, generation)
+        if state == "revalidate":
+            executor.get_executor().submit(self._refresh, key, loader, generation)
+        return value
+
+    async def aget(self, key, loader):
+        """Async get: misses load on the DB executor, stale hits refresh in the background."""
+        if not self.enabled:
+            return await executor.run(loader)
+        value, state, generation = self._lookup(key)
+        if state == "miss":
+            return await executor.run(self._load, key, loader, generation)
+        if state == "revalidate":
+            executor.get_executor().submit(self._refresh, key, loader, generation)
+        return value
+
+
+class ByteLRU:
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()  # key -> bytes-like value
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store `value`; values larger than the whole budget are not cached."""
+        n = len(value)
+        if n > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += n
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._size = 0
+            else:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._size -= len(old)
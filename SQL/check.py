@@ -1,5 +1,15 @@
+import re
+import sys
 from typing import Any, Dict
 
+from SQL import audit
+
+# StatusText fragments that mean the document already reached ECOS/IAPR (checkpoint 2)
+SUCCESS_MARKERS = (
+    "has already been sent to ECOS.",
+    "Successfully submitted to IAPR",
+)
+
 
 def _first_scalar(val: Any) -> Any:
     """Return a scalar value from a pandas Series/list/tuple, preferring first non-None.
@@ -8,10 +18,10 @@ def _first_scalar(val: Any) -> Any:
     if val is None:
         return None
     try:
-        # Avoid hard dependency if pandas isn't imported
-        from pandas import Series  # type: ignore
-
-        if isinstance(val, Series):
+        # Avoid hard dependency if pandas isn't imported: a Series can only
+        # exist if pandas was already loaded, so never trigger the import here
+        pd = sys.modules.get("pandas")
+        if pd is not None and isinstance(val, pd.Series):
             for x in val.tolist():
                 if x is not None:
                     return x
@@ -27,26 +37,49 @@ def _first_scalar(val: Any) -> Any:
     return val
 
 
+def row_count(data) -> int:
+    """Number of rows in a DataFrame or in a list of rows (rows.Record)."""
+    shape = getattr(data, "shape", None)
+    if shape is not None:
+        return shape[0]
+    return len(data)
+
+
+def first_row(data):
+    """First row of a DataFrame (as a Series) or of a list of rows."""
+    if hasattr(data, "iloc"):
+        return data.iloc[0]
+    return data[0]
+
+
+def row_field(row, name: str) -> Any:
+    """Column value from a Series or Record row; None if absent.
+    Duplicate columns are reduced to their first non-None value.
+    """
+    try:
+        val = row[name] if name in row else None
+    except Exception:
+        val = None
+    return _first_scalar(val)
+
+
 def check_document_status(df):
     # Exactly one row must be returned
-    if df is None or df.shape[0] != 1:
-        print(
-            "Fail • CheckPoint 1/2 • Reason: Multiple records found, please refine the search"
-            if df is not None and df.shape[0] != 1
-            else "Fail • CheckPoint 1/2 • Reason: No record found"
+    if df is None or row_count(df) != 1:
+        audit.event(
+            "status_check",
+            rows=row_count(df) if df is not None else 0,
+            passed=False,
+            reason="Multiple records found, please refine the search"
+            if df is not None and row_count(df) != 1
+            else "No record found",
         )
         return None
 
-    print("Pass • CheckPoint 1/2 • Reason: Exactly one record found")
-    row = df.iloc[0]
+    row = first_row(df)
 
     # Resolve Status robustly (handles duplicate columns that yield a Series)
-    status_val = None
-    try:
-        status_val = row["Status"] if "Status" in row.index else None
-    except Exception:
-        status_val = None
-    status_val = _first_scalar(status_val)
+    status_val = row_field(row, "Status")
 
     status_is_updatable = False
     if status_val is not None:
@@ -56,22 +89,38 @@ def check_document_status(df):
             s = str(status_val).strip()
             status_is_updatable = s in {"0", "False", "false"}
 
-    if status_is_updatable:
-        print("Pass • CheckPoint 2/2 • Reason: Record is updatable")
-        # Resolve fDocumentGID robustly
-        try:
-            uid_val = row["fDocumentGID"] if "fDocumentGID" in row.index else None
-        except Exception:
-            uid_val = None
-        unique_id = _first_scalar(uid_val)
-        return unique_id
-    else:
-        print("Fail • CheckPoint 2/2 • Reason: Record is healthy (no update required)")
-        return None
-
-
-def evaluate_checkpoints(df) -> Dict[str, Any]:
-    """Evaluate tri-state checkpoints on the dataframe result.
+    # Resolve fDocumentGID robustly
+    unique_id = row_field(row, "fDocumentGID")
+    audit.event(
+        "status_check",
+        document=row_field(row, "ADCode"),
+        gid=unique_id,
+        rows=1,
+        passed=status_is_updatable,
+        reason="Record is updatable" if status_is_updatable else "Record is healthy (no update required)",
+    )
+    return unique_id if status_is_updatable else None
+
+
+def _audit_checkpoints(result, document, rows, row=None):
+    audit.event(
+        "checkpoints",
+        document=document if document is not None else (row_field(row, "ADCode") if row is not None else None),
+        gid=row_field(row, "fDocumentGID") if row is not None else None,
+        rows=rows,
+        cp1=result["cp1"]["pass"],
+        cp2=result["cp2"]["pass"],
+        cp3=result["cp3"]["pass"],
+        all_pass=result["all_pass"],
+        status_text=row_field(row, "StatusText") if row is not None else None,
+    )
+
+
+def evaluate_checkpoints(df, document=None) -> Dict[str, Any]:
+    """Evaluate tri-state checkpoints on the query result.
+
+    Accepts a pandas DataFrame or a list of rows from fetch_data.get_sql_rows.
+    The outcome is written to the audit log (SQL/audit.py) under `document`.
 
     Returns a dict:
     {
@@ -91,49 +140,36 @@ def evaluate_checkpoints(df) -> Dict[str, Any]:
     }
 
     # Checkpoint 1: Exactly one row
-    if df is None or df.shape[0] != 1:
+    if df is None or row_count(df) != 1:
         msg = (
             "Checkpoint 1/3 Fail: Multiple records found"
-            if df is not None and df.shape[0] != 1
+            if df is not None and row_count(df) != 1
             else "Checkpoint 1/3 Fail: No record found"
         )
-        print(msg)
         result["cp1"] = {"pass": False, "message": msg}
+        _audit_checkpoints(result, document, row_count(df) if df is not None else 0,
+                           first_row(df) if df is not None and row_count(df) else None)
         return result
 
-    print("Checkpoint 1/3 Passed: Exactly one record found")
     result["cp1"] = {"pass": True, "message": "Checkpoint 1/3 Passed: Exactly one record found"}
 
-    row = df.iloc[0]
+    row = first_row(df)
 
     # Checkpoint 2: StatusText indicates successful submission to ECOS/IAPR
     # Accept multiple possible success messages
-    success_markers = [
-        "has already been sent to ECOS.",
-        "Successfully submitted to IAPR",
-    ]
-    try:
-        st_raw = row["StatusText"] if "StatusText" in row.index else None
-    except Exception:
-        st_raw = None
-    st_raw = _first_scalar(st_raw)
+    success_markers = SUCCESS_MARKERS
+    st_raw = row_field(row, "StatusText")
     st_str = str(st_raw).strip() if st_raw is not None else ""
     st_low = st_str.lower()
     markers_low = [m.lower() for m in success_markers]
     if any(m in st_low for m in markers_low):
-        print("Checkpoint 2/3 Passed: Record has already been sent to ECOS")
         result["cp2"] = {"pass": True, "message": "Checkpoint 2/3 Passed: Record has already been sent to ECOS"}
     else:
         msg2 = "Checkpoint 2/3 Fail: Record has not been sent to ECOS yet"
-        print(msg2)
         result["cp2"] = {"pass": False, "message": msg2}
 
     # Checkpoint 3: Updatable (Status == 0)
-    try:
-        status_val = row["Status"] if "Status" in row.index else None
-    except Exception:
-        status_val = None
-    status_val = _first_scalar(status_val)
+    status_val = row_field(row, "Status")
 
     status_is_updatable = False
     if status_val is not None:
@@ -144,18 +180,65 @@ def evaluate_checkpoints(df) -> Dict[str, Any]:
             status_is_updatable = s in {"0", "False", "false"}
 
     if status_is_updatable:
-        print("Checkpoint 3/3 Passed: Record is updatable")
         result["cp3"] = {"pass": True, "message": "Checkpoint 3/3 Passed: Record is updatable"}
         # Resolve unique id
-        try:
-            uid_val = row["fDocumentGID"] if "fDocumentGID" in row.index else None
-        except Exception:
-            uid_val = None
-        result["unique_id"] = _first_scalar(uid_val)
+        result["unique_id"] = row_field(row, "fDocumentGID")
     else:
         msg3 = "Checkpoint 3/3 Fail: Record is healthy (no update required)"
-        print(msg3)
         result["cp3"] = {"pass": False, "message": msg3}
 
     result["all_pass"] = bool(result["cp1"]["pass"] and result["cp2"]["pass"] and result["cp3"]["pass"])
-    return result
\ No newline at end of file
+    _audit_checkpoints(result, document, 1, row)
+    return result
+
+
+def _resolve_column(df, name):
+    """Case-insensitive column lookup; returns the actual column label or None."""
+    if name in df.columns:
+        return name
+    lname = name.lower()
+    for c in df.columns:
+        if str(c).lower() == lname:
+            return c
+    return None
+
+
+def evaluate_checkpoints_frame(df, document_col: str = "ADCode"):
+    """Vectorized checkpoints over a whole result (e.g. the auto.sql frame).
+
+    Returns a copy of df with boolean columns, computed in one pass and
+    without printing:
+      cp1: the document (ADCode) occurs in exactly one row
+      cp2: StatusText contains one of SUCCESS_MARKERS (case-insensitive)
+      cp3: Status == 0 (updatable)
+      all_pass: cp1 & cp2 & cp3 (fix-ready)
+    Missing columns make the corresponding checkpoint False.
+    """
+    pd = sys.modules["pandas"]  # a DataFrame implies pandas is loaded
+    false = pd.Series(False, index=df.index)
+
+    doc_col = _resolve_column(df, document_col)
+    if doc_col is not None:
+        docs = df[doc_col].astype("string").str.strip()
+        cp1 = docs.map(docs.value_counts()).eq(1).fillna(False).astype(bool)
+    else:
+        cp1 = false
+
+    st_col = _resolve_column(df, "StatusText")
+    if st_col is not None:
+        pattern = "|".join(re.escape(m) for m in SUCCESS_MARKERS)
+        st = df[st_col].astype("string")
+        cp2 = st.str.contains(pattern, case=False, regex=True).fillna(False).astype(bool)
+    else:
+        cp2 = false
+
+    status_col = _resolve_column(df, "Status")
+    if status_col is not None:
+        status = df[status_col]
+        numeric_zero = pd.to_numeric(status, errors="coerce").eq(0)
+        text_zero = status.astype("string").str.strip().isin(["0", "False", "false"]).fillna(False)
+        cp3 = (numeric_zero | text_zero).astype(bool)
+    else:
+        cp3 = false
+
+    return df.assign(cp1=cp1, cp2=cp2, cp3=cp3, all_pass=cp1 & cp2 & cp3)
\ No newline at end of file
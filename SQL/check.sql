@@ -10,7 +10,8 @@ SELECT
     AuthenticationCode,
     MarkID,
     ProviderName,
-    QRCode,
+    -- The image itself is fetched on demand by qr.sql
+    CASE WHEN QRCode IS NULL THEN 0 ELSE 1 END AS HasQRCode,
     InvoiceURL,
     t.ESDCreated,
     t.ESUCreated,
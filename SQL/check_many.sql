@@ -0,0 +1,34 @@
+/*
+ * Copyright (c) Ioannis E. Kommas 2025. All Rights Reserved
+ */
+
+-- Batch variant of check.sql (documents is an expanding list bind)
+
+SELECT
+    ADCode,
+    Status,
+    d.fDocumentGID,
+    UID,
+    AuthenticationCode,
+    MarkID,
+    ProviderName,
+    -- The image itself is fetched on demand by qr.sql
+    CASE WHEN QRCode IS NULL THEN 0 ELSE 1 END AS HasQRCode,
+    InvoiceURL,
+    t.ESDCreated,
+    t.ESUCreated,
+    CurrencyNetValue,
+    CurrencyTotalValue,
+    CurrencyVATValue,
+    fCashAccountTypeCode,
+    AuthorizationID,
+    StatusText
+
+FROM ESFIEinvoiceProviderDetails d
+JOIN ESFIDocumentTrade t
+    ON d.fdocumentgid = t.GID
+LEFT JOIN ESFILineLiquidityAccount L
+    ON t.GID = L.fDocumentGID
+LEFT JOIN ESFICashAccount AS CA
+            ON L.fLiquidityAccountGID = CA.GID
+WHERE t.adcode IN :documents
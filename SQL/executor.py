@@ -0,0 +1,52 @@
+"""Dedicated, bounded thread pool for blocking database work.
+
+The FastAPI handlers are `async def`; running pyodbc/pandas calls directly in
+them would stall the event loop for every other request. `run()` hands the
+call to this pool instead, so at most DB_MAX_WORKERS queries run at once and
+the loop stays free to serve other operators.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def max_workers():
+    """Concurrency limit for DB work (DB_MAX_WORKERS in .env, default 4)."""
+    try:
+        return max(1, int(os.getenv("DB_MAX_WORKERS", "4")))
+    except (TypeError, ValueError):
+        return 4
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=max_workers(), thread_name_prefix="ecos-db")
+    return _executor
+
+
+async def run(fn, *args, **kwargs):
+    """Run a blocking callable on the DB pool and await its result.
+    The caller's context variables are carried over to the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def shutdown(wait=False):
+    """Stop the pool (called on application shutdown)."""
+    global _executor
+    with _executor_lock:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.shutdown(wait=wait, cancel_futures=True)
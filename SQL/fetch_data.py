@@ -1,23 +1,64 @@
 #  Copyright (c) Ioannis E. Kommas 2023. All Rights Reserved
 
 import os
-from sqlalchemy import text
-import pandas as pd
 import logging
-from SQL import sql_connect
-
-pd.set_option("display.max_columns", None)
-pd.set_option("display.width", 1000)
-pd.set_option("display.max_rows", None)
+from SQL import sql_connect, rows, health, metrics, shared_cache
 
 logging.basicConfig(level=logging.INFO)
 
+_pd = None
+
+
+def _pandas():
+    """Import pandas on first use (keeps module import and app startup fast)."""
+    global _pd
+    if _pd is None:
+        import pandas as pd
+
+        pd.set_option("display.max_columns", None)
+        pd.set_option("display.width", 1000)
+        pd.set_option("display.max_rows", None)
+        _pd = pd
+    return _pd
+
+
+def _read_query(sfile, tuple_data=None):
+    script_directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        with open(f"{script_directory}/{sfile}", "r") as file:
+            query = file.read()
+            if tuple_data and isinstance(tuple_data, tuple):
+                query = query.replace("{tuple_data}", str(tuple_data))
+            return query
+    except FileNotFoundError:
+        logging.error("File not found: %s", sfile)
+    except Exception as e:
+        logging.exception("Error occurred: %s", e)
+
+
+def _statement(query, params=None):
+    """text() statement with bind parameters; list/tuple values become
+    expanding binds so `IN :name` accepts a Python list.
+    """
+    from sqlalchemy import bindparam, text
+
+    stmt = text(query)
+    if params:
+        stmt = stmt.bindparams(
+            *[
+                bindparam(k, v, expanding=True) if isinstance(v, (list, tuple)) else bindparam(k, v)
+                for k, v in params.items()
+            ]
+        )
+    return stmt
+
 
 def get_sql_data(
     sql_file: object,
     params: object = None,
     tuple_data: tuple = None,
-    connection: object = sql_connect.connect(),
+    connection: object = None,
+    cache: bool = True,
 ) -> object:
     """
     Executes a SQL query and returns the result as a pandas DataFrame.
@@ -26,38 +67,104 @@ def get_sql_data(
     :param tuple_data:
     :param sql_file: The file name (including its path) that contains the SQL query.
     :param connection: The connection object to the SQL database.
+                       Default is None, which borrows from the shared pooled engine.
     :param params: An optional dictionary to be sent to the SQL query with bind parameters.
                    Default is None, which means no parameters will be provided to the query.
+    :param cache: False bypasses the shared cross-worker cache (SQL/shared_cache.py).
     :return: A pandas DataFrame with the results obtained from the SQL query.
              Returns None if an error occurred or no query was executed.
     """
+    if connection is None and cache:
+        # Registered files are shared across workers when SHARED_CACHE_FILE is set
+        return shared_cache.cached(
+            "frame", sql_file, params, tuple_data, lambda: _get_sql_data(sql_file, params, tuple_data)
+        )
+    return _get_sql_data(sql_file, params, tuple_data, connection)
+
+
+def _get_sql_data(sql_file, params=None, tuple_data=None, connection=None):
     if connection == "2":
         connection = sql_connect.connect_lato()
+    elif connection is None:
+        connection = sql_connect.get_engine()
+        if connection is None:
+            return None
+
+    query = _read_query(sql_file, tuple_data)
+
+    if query:
+        pd = _pandas()
+        with metrics.timer(sql_file, "select") as t:
+            try:
+                df = pd.read_sql_query(_statement(query, params), connection)
+                t.rows = len(df.index)
+                health.record_success()
+                return df
+            except Exception as e:
+                t.error = True
+                health.record_error(e)
+                logging.exception("Error occurred while executing SQL query: %s", e)
+
+    return None
 
-    def get_query_from_file(sfile):
-        script_directory = os.path.dirname(os.path.abspath(__file__))
-        try:
-            with open(f"{script_directory}/{sfile}", "r") as file:
-                query = file.read()
-                if tuple_data and isinstance(tuple_data, tuple):
-                    query = query.replace("{tuple_data}", str(tuple_data))
-                return query
-        except FileNotFoundError:
-            logging.error("File not found: %s", sfile)
-        except Exception as e:
-            logging.exception("Error occurred: %s", e)
-
-    query = get_query_from_file(sql_file)
+
+def get_sql_rows(
+    sql_file: object,
+    params: object = None,
+    tuple_data: tuple = None,
+    connection: object = None,
+    cache: bool = True,
+) -> object:
+    """
+    Executes a SQL query and returns the rows as a list of `rows.Record` objects,
+    without going through pandas. Meant for small results such as single-document
+    lookups (check.sql), where building a DataFrame dominates the cost.
+
+    :param sql_file: The file name (including its path) that contains the SQL query.
+    :param params: An optional dictionary to be sent to the SQL query with bind parameters.
+    :param tuple_data: Optional tuple substituted for {tuple_data} in the query text.
+    :param connection: An engine or connection. Default is None, which borrows
+                       from the shared pooled engine.
+    :param cache: False bypasses the shared cross-worker cache (SQL/shared_cache.py),
+                  e.g. for reads that decide whether to fix a document.
+    :return: A list of Record rows (possibly empty).
+             Returns None if an error occurred or no query was executed.
+    """
+    if connection is None and cache:
+        return shared_cache.cached(
+            "rows", sql_file, params, tuple_data, lambda: _get_sql_rows(sql_file, params, tuple_data)
+        )
+    return _get_sql_rows(sql_file, params, tuple_data, connection)
+
+
+def _get_sql_rows(sql_file, params=None, tuple_data=None, connection=None):
+    if connection is None:
+        connection = sql_connect.get_engine()
+        if connection is None:
+            return None
+
+    query = _read_query(sql_file, tuple_data)
 
     if query:
-        try:
-            # Check if params is not None before calling bindparams
-            if params:
-                df = pd.read_sql_query(text(query).bindparams(**params), connection)
-            else:
-                df = pd.read_sql_query(text(query), connection)
-            return df
-        except Exception as e:
-            logging.exception("Error occurred while executing SQL query: %s", e)
+        with metrics.timer(sql_file, "select") as t:
+            try:
+                stmt = _statement(query, params)
+                if hasattr(connection, "execute"):
+                    records = _to_records(connection.execute(stmt))
+                else:
+                    with connection.connect() as conn:
+                        records = _to_records(conn.execute(stmt))
+                t.rows = len(records)
+                health.record_success()
+                return records
+            except Exception as e:
+                t.error = True
+                health.record_error(e)
+                logging.exception("Error occurred while executing SQL query: %s", e)
 
     return None
+
+
+def _to_records(result):
+    index = rows.make_index(result.keys())
+    return [rows.Record(index, r) for r in result]
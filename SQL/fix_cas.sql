@@ -0,0 +1,87 @@
+/*
+ * Copyright (c) Ioannis E. Kommas 2025. All Rights Reserved
+ */
+
+-- Compare-and-set fix (FIX_MODE=cas): the checkpoint guards of check.py are part
+-- of the WHERE clause, so the UPDATE only touches a document that is still
+-- fixable, and the updated row (same columns as check.sql) comes back in the
+-- same round trip. No row returned means nothing was fixable.
+--   checkpoint 1  exactly one check.sql row for the document
+--   checkpoint 2  StatusText carries a success marker (check.SUCCESS_MARKERS)
+--   checkpoint 3  Status = 0
+-- The guards match the classic path (main._plan_fix), so FIX_MODE never changes
+-- which documents can be fixed, and the SET is the one of set.sql.
+-- OUTPUT goes INTO a table variable because a bare OUTPUT clause is rejected
+-- (error 334) when the target table has enabled triggers.
+
+SET NOCOUNT ON;
+
+DECLARE @updated TABLE (
+    ADCode nvarchar(max),
+    Status int,
+    fDocumentGID uniqueidentifier,
+    UID nvarchar(max),
+    AuthenticationCode nvarchar(max),
+    MarkID nvarchar(max),
+    ProviderName nvarchar(max),
+    HasQRCode int,
+    InvoiceURL nvarchar(max),
+    ESDCreated datetime,
+    ESUCreated nvarchar(max),
+    CurrencyNetValue decimal(28, 6),
+    CurrencyTotalValue decimal(28, 6),
+    CurrencyVATValue decimal(28, 6),
+    fCashAccountTypeCode nvarchar(max),
+    AuthorizationID nvarchar(max),
+    StatusText nvarchar(max)
+);
+
+UPDATE d
+SET
+    Status = 1
+OUTPUT
+    t.ADCode,
+    inserted.Status,
+    inserted.fDocumentGID,
+    inserted.UID,
+    inserted.AuthenticationCode,
+    inserted.MarkID,
+    inserted.ProviderName,
+    CASE WHEN inserted.QRCode IS NULL THEN 0 ELSE 1 END AS HasQRCode,
+    inserted.InvoiceURL,
+    t.ESDCreated,
+    t.ESUCreated,
+    t.CurrencyNetValue,
+    t.CurrencyTotalValue,
+    t.CurrencyVATValue,
+    CA.fCashAccountTypeCode,
+    L.AuthorizationID,
+    inserted.StatusText
+INTO @updated
+
+FROM ESFIEinvoiceProviderDetails d
+JOIN ESFIDocumentTrade t
+    ON d.fdocumentgid = t.GID
+LEFT JOIN ESFILineLiquidityAccount L
+    ON t.GID = L.fDocumentGID
+LEFT JOIN ESFICashAccount AS CA
+            ON L.fLiquidityAccountGID = CA.GID
+WHERE t.adcode = :document
+    AND d.Status = 0
+    AND (
+        d.StatusText LIKE :success_1
+        OR d.StatusText LIKE :success_2
+    )
+    AND (
+        SELECT COUNT(*)
+        FROM ESFIEinvoiceProviderDetails d2
+        JOIN ESFIDocumentTrade t2
+            ON d2.fdocumentgid = t2.GID
+        LEFT JOIN ESFILineLiquidityAccount L2
+            ON t2.GID = L2.fDocumentGID
+        LEFT JOIN ESFICashAccount AS CA2
+            ON L2.fLiquidityAccountGID = CA2.GID
+        WHERE t2.adcode = :document
+    ) = 1;
+
+SELECT * FROM @updated;
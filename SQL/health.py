@@ -0,0 +1,167 @@
+"""Database circuit breaker with a background reconnect monitor.
+
+Connection failures are counted per process. After DB_BREAKER_THRESHOLD
+consecutive failures (or one failed engine creation) the breaker opens: queries
+return None at once instead of waiting on ODBC timeouts, and a daemon thread
+probes the server off the request path with exponential backoff
+(DB_PROBE_BACKOFF seconds, doubling up to DB_PROBE_BACKOFF_MAX). The first
+successful probe closes the breaker. On macOS with IP_EM set the monitor also
+makes one VPN attempt per outage (sql_connect.open_vpn).
+"""
+
+import logging
+import os
+import threading
+import time
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def is_connectivity_error(exc):
+    """True for errors that mean the server is unreachable, not a bad query."""
+    try:
+        from sqlalchemy import exc as sa_exc
+    except ImportError:
+        return False
+    if isinstance(exc, sa_exc.DBAPIError) and exc.connection_invalidated:
+        return True
+    return isinstance(exc, (sa_exc.OperationalError, sa_exc.InterfaceError))
+
+
+def _probe():
+    from SQL import sql_connect
+    return sql_connect.probe()
+
+
+def _try_vpn():
+    from SQL import sql_connect
+    return sql_connect.open_vpn()
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=3, backoff=2.0, backoff_max=60.0, probe=_probe, reconnect=_try_vpn):
+        self.threshold = max(int(threshold), 1)
+        self.backoff = max(float(backoff), 0.01)
+        self.backoff_max = max(float(backoff_max), self.backoff)
+        self._probe = probe
+        self._reconnect = reconnect
+        self._failures = 0
+        self._opened_at = None
+        self._next_probe_at = None
+        self._last_error = None
+        self._monitor = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        """False while the breaker is open: callers should fail fast."""
+        return self._opened_at is None
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            opened_at, next_probe_at = self._opened_at, self._next_probe_at
+            return {
+                "state": "open" if opened_at is not None else "closed",
+                "failures": self._failures,
+                "open_for": round(now - opened_at, 1) if opened_at is not None else None,
+                "next_probe_in": round(max(next_probe_at - now, 0.0), 1) if next_probe_at is not None else None,
+                "last_error": self._last_error,
+            }
+
+    def record_success(self):
+        if self._failures == 0 and self._opened_at is None:
+            return
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._next_probe_at = None
+        if was_open:
+            logging.info("Database reachable again, circuit closed")
+
+    def record_failure(self, error=None, trip=False):
+        """Count one connection failure; `trip` opens the breaker immediately."""
+        with self._lock:
+            self._failures += 1
+            if error is not None:
+                self._last_error = f"{type(error).__name__}: {error}"[:300]
+            if self._opened_at is not None:
+                return
+            if not trip and self._failures < self.threshold:
+                return
+            self._opened_at = time.monotonic()
+            self._next_probe_at = self._opened_at + self.backoff
+            if self._monitor is None or not self._monitor.is_alive():
+                self._monitor = threading.Thread(target=self._run_monitor, name="db-health", daemon=True)
+                self._monitor.start()
+        logging.warning("Database unreachable, circuit open (probing every %gs, backing off to %gs)",
+                        self.backoff, self.backoff_max)
+
+    def _run_monitor(self):
+        delay = self.backoff
+        reconnect_tried = False
+        while not self._stop.wait(delay):
+            try:
+                ok = self._probe()
+            except Exception:
+                ok = False
+            if ok:
+                self.record_success()
+                return
+            if not reconnect_tried and self._reconnect is not None:
+                # One VPN attempt per outage, then plain probing
+                reconnect_tried = True
+                try:
+                    self._reconnect()
+                except Exception:
+                    logging.exception("Reconnect attempt failed")
+            delay = min(delay * 2, self.backoff_max)
+            with self._lock:
+                self._next_probe_at = time.monotonic() + delay
+
+    def stop(self):
+        self._stop.set()
+
+
+# Process-wide breaker shared by fetch_data, update and sql_connect
+breaker = CircuitBreaker(
+    threshold=_env_float("DB_BREAKER_THRESHOLD", 3),
+    backoff=_env_float("DB_PROBE_BACKOFF", 2.0),
+    backoff_max=_env_float("DB_PROBE_BACKOFF_MAX", 60.0),
+)
+
+
+def allow():
+    return breaker.allow()
+
+
+def is_open():
+    return breaker.is_open
+
+
+def status():
+    return breaker.status()
+
+
+def record_success():
+    breaker.record_success()
+
+
+def record_error(exc):
+    """Count `exc` against the breaker if it is a connectivity error."""
+    if is_connectivity_error(exc):
+        breaker.record_failure(exc)
+
+
+def stop():
+    breaker.stop()
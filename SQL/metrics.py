@@ -0,0 +1,196 @@
+"""Low-overhead SQL metrics in Prometheus text format.
+
+fetch_data and update report every statement here, labelled by SQL file and
+operation (select/update): a latency histogram, a call counter per outcome and
+the number of rows returned/affected. Statements slower than SLOW_QUERY_MS
+also go to a bounded ring buffer (SLOW_QUERY_LOG_SIZE entries). `render()`
+adds engine pool and circuit breaker gauges at scrape time. Each statement is
+also recorded as an `sql` span of the current request (timing.py).
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import timing
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Histogram upper bounds in seconds (+Inf is implicit)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_QUERY_MS = _env_float("SLOW_QUERY_MS", 500.0)
+
+_lock = threading.Lock()
+_durations = {}  # (sql_file, op) -> [bucket counts..., +Inf count], sum, count
+_calls = {}  # (sql_file, op, outcome) -> count
+_rows = {}  # (sql_file, op) -> [total rows, last rows]
+_slow = deque(maxlen=max(int(_env_float("SLOW_QUERY_LOG_SIZE", 100)), 1))
+
+
+def observe(sql_file, op, seconds, rows=None, error=False):
+    """Record one statement. `rows` is the row count returned/affected, if known."""
+    sql_file = str(sql_file)
+    key = (sql_file, op)
+    i = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        hist = _durations.get(key)
+        if hist is None:
+            hist = _durations[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        hist[0][i] += 1
+        hist[1] += seconds
+        hist[2] += 1
+        outcome = (sql_file, op, "error" if error else "ok")
+        _calls[outcome] = _calls.get(outcome, 0) + 1
+        if rows is not None:
+            counts = _rows.get(key)
+            if counts is None:
+                counts = _rows[key] = [0, 0]
+            counts[0] += rows
+            counts[1] = rows
+    ms = seconds * 1000.0
+    if ms >= SLOW_QUERY_MS:
+        _slow.append({
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "sql_file": sql_file,
+            "op": op,
+            "ms": round(ms, 1),
+            "rows": rows,
+            "error": bool(error),
+        })
+        logging.warning("Slow query: %s (%s) took %.0f ms", sql_file, op, ms)
+
+
+class timer:
+    """`with metrics.timer("check.sql", "select") as t: ...; t.rows = n`"""
+
+    __slots__ = ("sql_file", "op", "rows", "error", "_start")
+
+    def __init__(self, sql_file, op):
+        self.sql_file = sql_file
+        self.op = op
+        self.rows = None
+        self.error = False
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        timing.add("sql", seconds, self.sql_file)
+        observe(self.sql_file, self.op, seconds, rows=self.rows, error=self.error or exc_type is not None)
+        return False
+
+
+def slow_queries():
+    """Most recent slow statements, newest first."""
+    return list(reversed(_slow))
+
+
+def reset():
+    with _lock:
+        _durations.clear()
+        _calls.clear()
+        _rows.clear()
+        _slow.clear()
+
+
+def _labels(**labels):
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def _num(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def _pool_lines():
+    from SQL import sql_connect, health
+
+    lines = [
+        "# HELP ecos_db_circuit_open 1 while the database circuit breaker is open.",
+        "# TYPE ecos_db_circuit_open gauge",
+        f"ecos_db_circuit_open {1 if health.is_open() else 0}",
+    ]
+    stats = (
+        ("size", "Configured pool size."),
+        ("checkedout", "Connections currently in use."),
+        ("checkedin", "Idle connections in the pool."),
+        ("overflow", "Connections open beyond pool size (negative until the pool has filled)."),
+    )
+    engines = sql_connect.engines()
+    for stat, help_text in stats:
+        samples = []
+        for name, engine in engines.items():
+            fn = getattr(getattr(engine, "pool", None), stat, None)
+            if not callable(fn):
+                continue
+            try:
+                samples.append(f"ecos_sql_pool_{stat}{_labels(engine=name)} {fn()}")
+            except Exception:
+                continue
+        if samples:
+            lines.append(f"# HELP ecos_sql_pool_{stat} {help_text}")
+            lines.append(f"# TYPE ecos_sql_pool_{stat} gauge")
+            lines.extend(samples)
+    return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        durations = {k: (list(v[0]), v[1], v[2]) for k, v in _durations.items()}
+        calls = dict(_calls)
+        rows = {k: list(v) for k, v in _rows.items()}
+
+    lines = [
+        "# HELP ecos_sql_duration_seconds SQL statement latency by file.",
+        "# TYPE ecos_sql_duration_seconds histogram",
+    ]
+    for (sql_file, op), (buckets, total, count) in sorted(durations.items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += n
+            le = bound if bound == "+Inf" else _num(bound)
+            lines.append(f"ecos_sql_duration_seconds_bucket{_labels(sql_file=sql_file, op=op, le=le)} {cumulative}")
+        lines.append(f"ecos_sql_duration_seconds_sum{_labels(sql_file=sql_file, op=op)} {_num(total)}")
+        lines.append(f"ecos_sql_duration_seconds_count{_labels(sql_file=sql_file, op=op)} {count}")
+
+    lines += [
+        "# HELP ecos_sql_statements_total SQL statements executed, by outcome.",
+        "# TYPE ecos_sql_statements_total counter",
+    ]
+    for (sql_file, op, outcome), n in sorted(calls.items()):
+        lines.append(f"ecos_sql_statements_total{_labels(sql_file=sql_file, op=op, outcome=outcome)} {n}")
+
+    lines += [
+        "# HELP ecos_sql_rows_total Rows returned (select) or affected (update).",
+        "# TYPE ecos_sql_rows_total counter",
+    ]
+    for (sql_file, op), (total, _) in sorted(rows.items()):
+        lines.append(f"ecos_sql_rows_total{_labels(sql_file=sql_file, op=op)} {total}")
+    lines += [
+        "# HELP ecos_sql_last_rows Rows of the most recent statement.",
+        "# TYPE ecos_sql_last_rows gauge",
+    ]
+    for (sql_file, op), (_, last) in sorted(rows.items()):
+        lines.append(f"ecos_sql_last_rows{_labels(sql_file=sql_file, op=op)} {last}")
+
+    lines += [
+        "# HELP ecos_sql_slow_queries Slow statements currently in the ring buffer.",
+        "# TYPE ecos_sql_slow_queries gauge",
+        f"ecos_sql_slow_queries {len(_slow)}",
+    ]
+    lines += _pool_lines()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,9 @@
+/*
+ * Copyright (c) Ioannis E. Kommas 2025. All Rights Reserved
+ */
+
+-- QR image of one document, served separately from the card by /qr/{gid}
+
+SELECT QRCode
+FROM ESFIEinvoiceProviderDetails
+WHERE fDocumentGID = :gid
@@ -0,0 +1,85 @@
+"""Compact, tuple-backed result rows for the pandas-free lookup path.
+
+A single-document lookup almost always returns one row; building a DataFrame
+for it costs far more than the query itself. `Record` keeps the values in a
+tuple and shares one name -> position index across all rows of a result, so
+a row costs one small object plus its tuple.
+"""
+
+import math
+
+
+def _is_missing(v):
+    return v is None or (isinstance(v, float) and math.isnan(v))
+
+
+def make_index(keys):
+    """Build the shared name -> position index for a result's column names.
+    Duplicate column names map to a tuple of positions (first non-None wins).
+    """
+    positions = {}
+    for i, k in enumerate(keys):
+        positions.setdefault(str(k), []).append(i)
+    return {k: (p[0] if len(p) == 1 else tuple(p)) for k, p in positions.items()}
+
+
+class Record:
+    """One result row: values in a tuple, name access through a shared index."""
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = tuple(values)
+
+    def _lookup(self, pos):
+        if isinstance(pos, tuple):
+            for p in pos:
+                v = self._values[p]
+                if v is not None:
+                    return v
+            return None
+        return self._values[pos]
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._values[key]
+        return self._lookup(self._index[key])
+
+    def get(self, key, default=None):
+        pos = self._index.get(key)
+        if pos is None:
+            return default
+        return self._lookup(pos)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return list(self._index)
+
+    def values(self):
+        return [self._lookup(p) for p in self._index.values()]
+
+    def items(self):
+        return [(k, self._lookup(p)) for k, p in self._index.items()]
+
+    def to_dict(self, dropna=False):
+        """Return a plain dict; with dropna=True, None/NaN values are omitted."""
+        if dropna:
+            return {k: v for k, v in self.items() if not _is_missing(v)}
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self.items() == other.items()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Record({self.to_dict()!r})"
@@ -1,14 +1,24 @@
+import time
 
+from SQL import audit
 from SQL import update as updater
 
 
-def update(id_to_update, sql_file):
+def update(id_to_update, sql_file, document=None):
     if not id_to_update:
         return 0
 
-    print(f"ενημέρωση Εγγραφής με ID: {id_to_update}")
     params = {"unique_id": id_to_update}
     # execute SQL (UPDATE) and return affected row count
+    start = time.perf_counter()
     result = updater.execute_sql(sql_file, params)
-    print(f"Επιτυχής ενημέρωση: {result} Εγγραφή / Εγγραφές")
-    return result
\ No newline at end of file
+    audit.event(
+        "fix",
+        mode="classic",
+        document=document,
+        gid=id_to_update,
+        sql_file=sql_file,
+        affected=result,
+        duration_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+    return result
@@ -0,0 +1,197 @@
+"""Optional result cache shared by all uvicorn workers on one host.
+
+With SHARED_CACHE_FILE set (a local SQLite file, e.g. /tmp/ecos-cache.db),
+fetch_data.get_sql_data and get_sql_rows first look up SQL files that were
+`register`ed here, so workers share the candidate lists and recent document
+rows instead of each querying the ERP database. Entries expire after
+SHARED_CACHE_TTL seconds (default 15).
+
+Invalidation uses generation counters. Every entry belongs to a tag
+("candidates", "document:<code>") and stores the tag's generation as read
+*before* its query ran. `bump(tag)` increments the generation, which makes
+all of that tag's entries stale for every worker at once. A fix bumps the
+fixed document's tag and "candidates". `changed(tag)` tells a worker that
+another worker bumped a tag, so in-process caches can be dropped too.
+
+Without SHARED_CACHE_FILE every call falls through to the database. Errors
+(for example a locked or unwritable file) are logged and treated as cache
+misses. Values are pickled, so the file must only be writable by the app.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    " key TEXT PRIMARY KEY, tag TEXT NOT NULL, generation INTEGER NOT NULL,"
+    " expires REAL NOT NULL, value BLOB NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_entries_tag ON entries (tag)",
+    "CREATE TABLE IF NOT EXISTS generations (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL)",
+)
+# Expired rows are deleted once every this many writes
+_PRUNE_EVERY = 200
+
+
+def document_tag(document):
+    # ADCode comparisons in SQL Server are case-insensitive: so is the tag
+    return f"document:{str(document).strip().upper()}"
+
+
+class SharedCache:
+    def __init__(self, path, ttl=15.0):
+        self.path = path
+        self.ttl = float(ttl)
+        self._specs = {}  # sql_file -> (tag or callable(params) -> tag, ttl)
+        self._seen = {}  # tag -> generation last seen by this process
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path) and self.ttl > 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for ddl in _SCHEMA:
+                conn.execute(ddl)
+            self._local.conn = conn
+        return conn
+
+    def register(self, sql_file, tag, ttl=None):
+        """Cache results of `sql_file` under `tag` (a string or a function of the params)."""
+        self._specs[str(sql_file)] = (tag, self.ttl if ttl is None else float(ttl))
+
+    def _generation(self, conn, tag):
+        row = conn.execute("SELECT generation FROM generations WHERE tag = ?", (tag,)).fetchone()
+        return row[0] if row else 0
+
+    def cached(self, kind, sql_file, params, tuple_data, load):
+        """Return the shared result for this query, or run `load()` and store it.
+        `kind` separates results of the same query in different shapes (frame/rows).
+        """
+        spec = self._specs.get(str(sql_file)) if self.enabled else None
+        if spec is None:
+            return load()
+        tag, ttl = spec
+        try:
+            tag = tag(params) if callable(tag) else tag
+            key = hashlib.sha256(
+                repr((kind, str(sql_file), sorted((params or {}).items()), tuple_data)).encode("utf-8")
+            ).hexdigest()
+            conn = self._conn()
+            generation = self._generation(conn, tag)
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND generation = ? AND expires > ?",
+                (key, generation, time.time()),
+            ).fetchone()
+            if row is not None:
+                return pickle.loads(row[0])
+        except Exception as e:
+            logging.error("Shared cache read failed (%s): %s", self.path, e)
+            return load()
+
+        result = load()
+        if result is not None:
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, tag, generation, expires, value) VALUES (?, ?, ?, ?, ?)",
+                    (key, tag, generation, time.time() + ttl, pickle.dumps(result, pickle.HIGHEST_PROTOCOL)),
+                )
+                self._prune(conn)
+            except Exception as e:
+                logging.error("Shared cache write failed (%s): %s", self.path, e)
+        return result
+
+    def _prune(self, conn):
+        with self._lock:
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY:
+                return
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+
+    def bump(self, *tags):
+        """Invalidate every entry of `tags`, for all workers."""
+        if not self.enabled:
+            return
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for tag in tags:
+                    conn.execute(
+                        "INSERT INTO generations (tag, generation) VALUES (?, 1) "
+                        "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1",
+                        (tag,),
+                    )
+                    conn.execute("DELETE FROM entries WHERE tag = ?", (tag,))
+                    self._seen[tag] = self._generation(conn, tag)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logging.error("Shared cache invalidation failed (%s): %s", self.path, e)
+
+    def changed(self, tag):
+        """True if `tag` was bumped (by any worker) since this process last looked."""
+        if not self.enabled:
+            return False
+        try:
+            generation = self._generation(self._conn(), tag)
+        except Exception as e:
+            logging.error("Shared cache read failed (%s): %s", self.path, e)
+            return False
+        previous = self._seen.get(tag)
+        self._seen[tag] = generation
+        return previous is not None and previous != generation
+
+    def clear(self):
+        if not self.enabled:
+            return
+        try:
+            self._conn().execute("DELETE FROM entries")
+        except Exception as e:
+            logging.error("Shared cache clear failed (%s): %s", self.path, e)
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+shared = SharedCache(
+    path=os.getenv("SHARED_CACHE_FILE") or None,
+    ttl=_env_float("SHARED_CACHE_TTL", 15.0),
+)
+
+
+def enabled():
+    return shared.enabled
+
+
+def register(sql_file, tag, ttl=None):
+    shared.register(sql_file, tag, ttl)
+
+
+def cached(kind, sql_file, params, tuple_data, load):
+    return shared.cached(kind, sql_file, params, tuple_data, load)
+
+
+def bump(*tags):
+    shared.bump(*tags)
+
+
+def changed(tag):
+    return shared.changed(tag)
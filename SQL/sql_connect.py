@@ -1,20 +1,109 @@
 #  Copyright (c) Ioannis E. Kommas 2024. All Rights Reserved
 
 # Make the Connection
-import pyodbc
+# sqlalchemy (and through it pyodbc) is imported inside connect() so that
+# importing this module (and main.py) never pays for the driver stack before
+# the first query
 import time
 import socket
-from sqlalchemy.engine import URL
-from sqlalchemy import create_engine
 from dotenv import load_dotenv
 import os
+import sys
+import threading
+
+from SQL import health
+
+# Process-wide engine registry: one pooled engine per connection name, shared by
+# fetch_data (SELECT) and update (INSERT/UPDATE/DELETE)
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    v = os.getenv(name)
+    if v is None or str(v).strip() == "":
+        return default
+    return str(v).strip().lower() in {"1", "yes", "true", "on"}
+
+
+def pool_options():
+    """Pool settings for the shared engine, configurable via .env"""
+    return {
+        "pool_size": _env_int("SQL_POOL_SIZE", 5),
+        "max_overflow": _env_int("SQL_POOL_MAX_OVERFLOW", 10),
+        "pool_pre_ping": _env_bool("SQL_POOL_PRE_PING", True),
+        "pool_recycle": _env_int("SQL_POOL_RECYCLE", 1800),
+        "pool_timeout": _env_int("SQL_POOL_TIMEOUT", 30),
+    }
+
+
+def get_engine(name="default"):
+    """Return the shared pooled engine for `name`, creating it on first use.
+    Driver discovery and the test connection happen once per process; callers
+    afterwards only borrow a pooled connection.
+    Returns None while the health breaker is open (server known to be down):
+    callers fail fast and the health monitor reconnects in the background.
+    """
+    if not health.allow():
+        return None
+    engine = _engines.get(name)
+    if engine is not None:
+        return engine
+    with _engines_lock:
+        engine = _engines.get(name)
+        if engine is None:
+            engine = connect()
+            if engine is not None:
+                _engines[name] = engine
+            else:
+                health.breaker.record_failure(trip=True)
+        return engine
+
+
+def register_engine(engine, name="default"):
+    """Install an already built engine in the registry (e.g. another database)."""
+    with _engines_lock:
+        old = _engines.get(name)
+        _engines[name] = engine
+    if old is not None and old is not engine:
+        old.dispose()
+    return engine
+
+
+def engines():
+    """Snapshot of the registry: {name: engine} (e.g. for pool metrics)."""
+    with _engines_lock:
+        return dict(_engines)
+
+
+def dispose_engines():
+    """Close every pooled connection and empty the registry."""
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        try:
+            engine.dispose()
+        except Exception:
+            pass
 
 
 def connect():
+    """Build and test an engine, trying the preferred ODBC drivers once each.
+    Returns None if the server cannot be reached; retries and VPN attempts
+    happen off the request path (SQL/health.py), never here.
+    """
+    from sqlalchemy.engine import URL
+    from sqlalchemy import create_engine
+
     load_dotenv()
-    sql_counter = 0
-    max_retries = 3
-    my_ip = get_ip_address()
     # Driver preference: try ODBC 18 first (container installs 18), then 17 as fallback
     drivers = [
         "ODBC Driver 18 for SQL Server",
@@ -25,93 +114,92 @@ def connect():
     encrypt = os.getenv("ENCRYPT", "no")  # yes/no or true/false
     tsc = os.getenv("TSC", "no")  # TrustServerCertificate
 
-    for attempt in range(max_retries + 1):
+    # Build a connection string trying preferred drivers in order
+    last_error = None
+    for drv in drivers:
+        cnxn = (
+            f"DRIVER={{{drv}}};"
+            f"Server={os.getenv('SQL_SERVER')};"
+            f"UID={os.getenv('UID')};"
+            f"PWD={os.getenv('SQL_PWD')};"
+            f"Database={os.getenv('DATABASE')};"
+            f"Encrypt={encrypt};"
+            f"TrustServerCertificate={tsc}"
+        )
+        connection_url = URL.create("mssql+pyodbc", query={"odbc_connect": cnxn})
         try:
-            # Build a connection string trying preferred drivers in order
-            last_error = None
-            engine = None
-            for drv in drivers:
-                cnxn = (
-                    f"DRIVER={{{drv}}};"
-                    f"Server={os.getenv('SQL_SERVER')};"
-                    f"UID={os.getenv('UID')};"
-                    f"PWD={os.getenv('SQL_PWD')};"
-                    f"Database={os.getenv('DATABASE')};"
-                    f"Encrypt={encrypt};"
-                    f"TrustServerCertificate={tsc}"
-                )
-                connection_url = URL.create("mssql+pyodbc", query={"odbc_connect": cnxn})
-                try:
-                    engine = create_engine(connection_url)
-                    # Proactively test the connection so we fail fast here
-                    with engine.connect() as conn:
-                        pass
-                    break  # success
-                except Exception as e:
-                    last_error = e
-                    engine = None
-                    continue
-            if engine is None and last_error:
-                raise last_error
+            engine = create_engine(connection_url, **pool_options())
+            # Proactively test the connection so we fail fast here
+            with engine.connect() as conn:
+                pass
             return engine
-        except pyodbc.OperationalError:
-            if attempt < max_retries:
-                print(f"\r🔴: (SQL) Connection failed on attempt {attempt + 1}. Retrying...", end='')
-                time.sleep(2)  # Μικρή καθυστέρηση πριν την επόμενη προσπάθεια
-            else:
-                print(f"\r🔴: (!SQL!) Working Remotely: My IP ADDRESS is {my_ip}", end='')
-                return open_vpn(sql_counter)
-        except Exception:
-            # Treat any other exception similarly to OperationalError for retry logic
-            if attempt < max_retries:
-                print(f"\r🔴: (SQL) Connection initialization error on attempt {attempt + 1}. Retrying...", end='')
-                time.sleep(2)
-            else:
-                print(f"\r🔴: (!SQL!) Working Remotely: My IP ADDRESS is {my_ip}", end='')
-                return open_vpn(sql_counter)
-
-
-
-def open_vpn(sql_counter):
+        except Exception as e:
+            last_error = e
+            continue
+
+    print(f"\r🔴: (SQL) Connection failed: {last_error}", end='')
+    return None
+
+
+def probe(name="default"):
+    """One cheap round trip (SELECT 1) for the health monitor.
+    Creates and registers the engine if there is none yet.
+    """
+    engine = _engines.get(name)
+    if engine is None:
+        engine = connect()
+        if engine is None:
+            return False
+        register_engine(engine, name)
+        return True
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+        return True
+    except Exception:
+        return False
+
+
+def open_vpn():
+    """One attempt to bring up the macOS network service "VPN" (no retries).
+    Returns True if the VPN router answers afterwards. Called by the health
+    monitor thread once per outage, never on a request.
+    """
     load_dotenv()  # Φόρτωση μεταβλητών περιβάλλοντος από το .env αρχείο
+    if sys.platform != "darwin" or not os.getenv("IP_EM"):
+        return False
 
     # Έλεγχος αν το site (π.χ. Elounda Market) είναι προσβάσιμο
     EM_mode = os.system(f"ping -c 1 {os.getenv('IP_EM')} >/dev/null")
-    if EM_mode == 0:
-        print("\r🟢: (SQL) Elounda Market is UP, Trying to get VPN UP...", end='')
-
-        # Προσπάθεια σύνδεσης μέσω AppleScript
-        vpn_name = "VPN"
-        apple_script = f"""
-        tell application "System Events"
-            tell current location of network preferences
-                if exists service "{vpn_name}" then
-                    connect service "{vpn_name}"
-                end if
-            end tell
+    if EM_mode != 0:
+        print("\r🔴: (SQL) Internet on Site Is Down", end='')
+        return False
+
+    print("\r🟢: (SQL) Elounda Market is UP, Trying to get VPN UP...", end='')
+
+    # Προσπάθεια σύνδεσης μέσω AppleScript
+    vpn_name = "VPN"
+    apple_script = f"""
+    tell application "System Events"
+        tell current location of network preferences
+            if exists service "{vpn_name}" then
+                connect service "{vpn_name}"
+            end if
         end tell
-        """
-        os.system(f"osascript -e '{apple_script}'")
-
-        # Χρόνος αναμονής για να σταθεροποιηθεί η σύνδεση VPN
-        time.sleep(5)
-
-        # Έλεγχος εάν το VPN router είναι πλέον προσβάσιμο
-        Server_mode = os.system(f"ping -c 1 {os.getenv('IP_EM_ROUTER')} >/dev/null")
-        if Server_mode == 0:
-            print("\r🟢: (SQL) VPN IS UP", end='')
-            return connect()  # Σύνδεση με τη βάση δεδομένων
-        else:
-            sql_counter += 1
-            print(f"\r🔴: (SQL) VPN IS STILL DOWN || Tries: {sql_counter}", end='')
-            return open_vpn(sql_counter)  # Επανεκκίνηση της προσπάθειας για VPN
-
-    else:
-        sql_counter += 1
-        print(f"\r🔴: (SQL) Internet on Site Is Down || Tries: {sql_counter}", end='')
-        time.sleep(10)  # Καθυστέρηση πριν την επόμενη προσπάθεια
-        return open_vpn(sql_counter)  # Επανεκκίνηση προσπάθειας
-
+    end tell
+    """
+    os.system(f"osascript -e '{apple_script}'")
+
+    # Χρόνος αναμονής για να σταθεροποιηθεί η σύνδεση VPN
+    time.sleep(5)
+
+    # Έλεγχος εάν το VPN router είναι πλέον προσβάσιμο
+    Server_mode = os.system(f"ping -c 1 {os.getenv('IP_EM_ROUTER')} >/dev/null")
+    if Server_mode == 0:
+        print("\r🟢: (SQL) VPN IS UP", end='')
+        return True
+    print("\r🔴: (SQL) VPN IS STILL DOWN", end='')
+    return False
 
 
 def get_ip_address():
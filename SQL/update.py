@@ -2,12 +2,23 @@
 
 import os
 import logging
-from sqlalchemy import text
-from SQL import sql_connect
+from SQL import sql_connect, rows, health, metrics
 
 logging.basicConfig(level=logging.INFO)
 
 
+def _read_query(sfile):
+    script_directory = os.path.dirname(os.path.abspath(__file__))
+    full_path = os.path.join(script_directory, sfile)
+    try:
+        with open(full_path, "r", encoding="utf-8") as file:
+            return file.read()
+    except FileNotFoundError:
+        logging.error("File not found: %s", full_path)
+    except Exception as e:
+        logging.exception("Error reading SQL file: %s", e)
+
+
 def execute_sql(
     sql_file: str,
     params: dict | None = None,
@@ -16,33 +27,115 @@ def execute_sql(
     """
     Executes a SQL statement (INSERT/UPDATE/DELETE) from a file.
     Returns the number of affected rows.
+    The shared pooled engine is used unless a connection is passed.
     """
     if connection is None:
-        connection = sql_connect.connect()
+        connection = sql_connect.get_engine()
+        if connection is None:
+            return 0
+
+    query = _read_query(sql_file)
+    if not query:
+        return 0
+
+    from sqlalchemy import text
 
-    def get_query_from_file(sfile):
-        script_directory = os.path.dirname(os.path.abspath(__file__))
-        full_path = os.path.join(script_directory, sfile)
+    with metrics.timer(sql_file, "update") as t:
         try:
-            with open(full_path, "r", encoding="utf-8") as file:
-                return file.read()
-        except FileNotFoundError:
-            logging.error("File not found: %s", full_path)
+            # engine = connection (since connect() returns engine)
+            engine = connection
+            # open a transaction
+            with engine.begin() as conn:
+                result = conn.execute(text(query), params or {})
+                # rowcount = πόσες γραμμές άλλαξε
+                affected = result.rowcount
+            t.rows = affected
+            health.record_success()
+            return affected
         except Exception as e:
-            logging.exception("Error reading SQL file: %s", e)
+            t.error = True
+            health.record_error(e)
+            logging.exception("Error executing SQL statement: %s", e)
+            return 0
 
-    query = get_query_from_file(sql_file)
+
+def execute_sql_returning(
+    sql_file: str,
+    params: dict | None = None,
+    connection=None,
+) -> list | None:
+    """
+    Executes a SQL statement that returns rows (e.g. UPDATE ... OUTPUT) from a
+    file and commits it. Returns the rows as a list of rows.Record (empty if
+    the statement matched nothing), or None on error.
+    """
+    if connection is None:
+        connection = sql_connect.get_engine()
+        if connection is None:
+            return None
+
+    query = _read_query(sql_file)
     if not query:
-        return 0
+        return None
+
+    from sqlalchemy import text
+
+    with metrics.timer(sql_file, "update") as t:
+        try:
+            with connection.begin() as conn:
+                result = conn.execute(text(query), params or {})
+                records = []
+                if result.returns_rows:
+                    index = rows.make_index(result.keys())
+                    records = [rows.Record(index, r) for r in result]
+            t.rows = len(records)
+            health.record_success()
+            return records
+        except Exception as e:
+            t.error = True
+            health.record_error(e)
+            logging.exception("Error executing SQL statement: %s", e)
+            return None
+
+
+def execute_many(
+    statements: list,
+    connection=None,
+) -> list | None:
+    """
+    Executes several SQL statements from files in ONE transaction.
+    `statements` is a list of (sql_file, params) pairs; each file is read once.
+    Returns the affected row count per statement, in order, or None if any
+    statement failed (the whole transaction is rolled back).
+    """
+    if not statements:
+        return []
+    if connection is None:
+        connection = sql_connect.get_engine()
+        if connection is None:
+            return None
+
+    from sqlalchemy import text
+
+    compiled = {}
+    for sql_file, _ in statements:
+        if sql_file not in compiled:
+            query = _read_query(sql_file)
+            if not query:
+                return None
+            compiled[sql_file] = text(query)
 
     try:
-        # engine = connection (since connect() returns engine)
-        engine = connection
-        # open a transaction
-        with engine.begin() as conn:
-            result = conn.execute(text(query), params or {})
-            # rowcount = πόσες γραμμές άλλαξε
-            return result.rowcount
+        with connection.begin() as conn:
+            counts = []
+            # Timed per statement; the shared COMMIT is not attributed to any file
+            for sql_file, params in statements:
+                with metrics.timer(sql_file, "update") as t:
+                    t.rows = conn.execute(compiled[sql_file], params or {}).rowcount
+                counts.append(t.rows)
+        health.record_success()
+        return counts
     except Exception as e:
-        logging.exception("Error executing SQL statement: %s", e)
-        return 0
\ No newline at end of file
+        health.record_error(e)
+        logging.exception("Error executing SQL batch: %s", e)
+        return None
\ No newline at end of file
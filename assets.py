@@ -0,0 +1,74 @@
+"""Content-hash fingerprinted URLs for /static and /images.
+
+Templates call `{{ asset("/static/styles.css") }}`, which returns
+"/static/styles.css?v=<first 12 hex of the file's sha256>".
+`FingerprintedStaticFiles` serves a request whose ?v= matches the file's
+current hash with `Cache-Control: public, max-age=31536000, immutable`.
+Browsers then never ask for it again. Other requests (no ?v=, or an old
+hash) get `no-cache` and revalidate with ETag/Last-Modified as before. Editing
+a file changes its hash, so pages link the new URL immediately. Hashes are
+cached per file and recomputed when its mtime or size changes.
+"""
+
+import hashlib
+import os
+import threading
+from urllib.parse import parse_qs
+
+from fastapi.staticfiles import StaticFiles
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_directories = {}  # URL prefix -> directory
+_hashes = {}  # absolute path -> (mtime_ns, size, hash)
+_lock = threading.Lock()
+
+
+def file_hash(path, stat_result=None):
+    path = os.path.abspath(path)
+    st = stat_result or os.stat(path)
+    with _lock:
+        cached = _hashes.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            h.update(block)
+    digest = h.hexdigest()[:12]
+    with _lock:
+        _hashes[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def url(path):
+    """Fingerprinted URL for a file under a FingerprintedStaticFiles mount.
+    Unknown prefixes and missing files come back unchanged.
+    """
+    for prefix, directory in _directories.items():
+        if path.startswith(prefix + "/"):
+            full_path = os.path.join(directory, path[len(prefix) + 1:])
+            try:
+                return f"{path}?v={file_hash(full_path)}"
+            except OSError:
+                return path
+    return path
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    def __init__(self, *, directory, prefix, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        _directories[prefix.rstrip("/")] = directory
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        version = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v")
+        try:
+            current = file_hash(full_path, stat_result)
+        except OSError:
+            current = None
+        if version and current and version[0] == current:
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,4 @@
+"""Benchmarks for ECOS. Run each module from the project root, e.g.
+
+    python -m benchmarks.startup
+"""
@@ -0,0 +1,53 @@
+"""Minimal in-process ASGI client used by the benchmarks (no httpx needed)."""
+
+from urllib.parse import urlencode
+
+
+async def request(app, method, path, headers=None, body=b"", form=None):
+    """Send one HTTP request straight to an ASGI app.
+
+    Returns (status, headers_dict, body_bytes). Header names are lower-cased.
+    """
+    headers = dict(headers or {})
+    if form is not None:
+        body = urlencode(form).encode("utf-8")
+        headers.setdefault("content-type", "application/x-www-form-urlencoded")
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": raw_path,
+        "raw_path": raw_path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "root_path": "",
+        "headers": [(k.lower().encode("latin-1"), str(v).encode("latin-1")) for k, v in headers.items()]
+        + [(b"content-length", str(len(body)).encode("latin-1"))],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    status = 500
+    resp_headers = {}
+    chunks = []
+
+    async def send(message):
+        nonlocal status, resp_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            resp_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, resp_headers, b"".join(chunks)
@@ -0,0 +1,104 @@
+"""Check that the page routes overlap their independent queries.
+
+Every SQL call is replaced by a fake that sleeps for --delay seconds and
+records when it ran. /search and /search/{document} must run check.sql and
+auto.sql concurrently, and /fix must overlap the re-check with the candidate
+list, so each route should take about one delay per stage rather than the sum.
+Exits non-zero if any route serialises its queries.
+
+    python -m benchmarks.concurrency [--delay 0.2]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import main
+from SQL import audit, fetch_data, rows
+from SQL import set as sql_set
+
+from benchmarks.asgi import request
+
+_CHECK_COLUMNS = ["ADCode", "Status", "fDocumentGID", "StatusText", "ESDCreated", "ESUCreated"]
+
+
+class _Recorder:
+    def __init__(self, delay):
+        self.delay = delay
+        self.intervals = []
+        self.status = 0
+        self._lock = threading.Lock()
+
+    def _sleep(self, name):
+        start = time.perf_counter()
+        time.sleep(self.delay)
+        with self._lock:
+            self.intervals.append((name, start, time.perf_counter()))
+
+    def get_sql_rows(self, sql_file, params=None, *args, **kwargs):
+        self._sleep(sql_file)
+        index = rows.make_index(_CHECK_COLUMNS)
+        values = (params["document"], self.status, "GID-1", "has already been sent to ECOS.",
+                  "2025-01-01 10:00:00", "operator")
+        return [rows.Record(index, values)]
+
+    def load_candidate_page(self, cursor=None):
+        self._sleep("auto.sql")
+        return {"items": [{"document": "DOC-1", "status": 0}], "cursor": cursor, "next_cursor": None}
+
+    def update(self, id_to_update, sql_file, document=None):
+        self._sleep(sql_file)
+        self.status = 1
+        return 1
+
+    def overlapped(self, a, b):
+        """True if some `a` interval overlaps some `b` interval."""
+        xs = [i for i in self.intervals if i[0] == a]
+        ys = [i for i in self.intervals if i[0] == b]
+        return any(x[1] < y[2] and y[1] < x[2] for x in xs for y in ys)
+
+
+async def _timed(method, path, form=None):
+    start = time.perf_counter()
+    status, _, _ = await request(main.app, method, path, form=form)
+    assert status == 200, (path, status)
+    return time.perf_counter() - start
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.2, help="simulated query latency in seconds")
+    args = parser.parse_args(argv)
+
+    # Audit records go to stdout by default; keep the report readable
+    audit.log.path = os.getenv("AUDIT_FILE", os.devnull)
+    rec = _Recorder(args.delay)
+    fetch_data.get_sql_rows = rec.get_sql_rows
+    main._load_candidate_page = rec.load_candidate_page
+    sql_set.update = rec.update
+    main._auto_cache.ttl = 0  # always hit the (fake) database
+
+    failed = False
+    serial = 2 * args.delay
+    for method, path, form in (("POST", "/search", {"document": "DOC-1"}), ("GET", "/search/DOC-1", None)):
+        rec.intervals.clear()
+        elapsed = asyncio.run(_timed(method, path, form))
+        ok = rec.overlapped("check.sql", "auto.sql") and elapsed < serial * 0.8
+        failed |= not ok
+        print(f"{method:4} {path:14} {elapsed * 1000:7.1f} ms (serial would be {serial * 1000:.0f} ms)  {'OK' if ok else 'FAIL'}")
+
+    rec.intervals.clear()
+    rec.status = 0
+    elapsed = asyncio.run(_timed("POST", "/fix", {"document": "DOC-1"}))
+    # check+auto, then update, then re-check+auto: three stages instead of five queries
+    ok = rec.overlapped("check.sql", "auto.sql") and elapsed < 5 * args.delay * 0.8
+    failed |= not ok
+    print(f"POST /fix           {elapsed * 1000:7.1f} ms (serial would be {5 * args.delay * 1000:.0f} ms)  {'OK' if ok else 'FAIL'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,100 @@
+"""Microbenchmark: columnar _extract_documents_list vs the iterrows version.
+
+Generates auto.sql-like frames (duplicate liquidity lines per document,
+Status 0/2, StatusText markers), checks that both implementations return the
+same list, and times them. Exits non-zero if the outputs differ.
+
+    python -m benchmarks.extract [--sizes 10000,50000,200000]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import pandas as pd
+
+import main
+from SQL import check
+
+
+def make_frame(n, dup_rate=0.2, seed=3):
+    rnd = random.Random(seed)
+    docs, statuses, texts, created = [], [], [], []
+    i = 0
+    while len(docs) < n:
+        copies = 2 if rnd.random() < dup_rate else 1
+        status = rnd.choice((0, 0, 2))
+        text = rnd.choice(("has already been sent to ECOS.", "Successfully submitted to IAPR", "Timeout"))
+        for _ in range(copies):
+            docs.append(f" ΑΠΛ-Α-{i:07d} " if i % 50 == 0 else f"ΑΠΛ-Α-{i:07d}")
+            statuses.append(status)
+            texts.append(text)
+            created.append(f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00")
+        i += 1
+    return pd.DataFrame({
+        "ADCode": docs[:n],
+        "Status": statuses[:n],
+        "ESDCreated": created[:n],
+        "StatusText": texts[:n],
+    })
+
+
+def legacy_extract(df, presorted=False):
+    """The iterrows implementation this benchmark replaced (same output contract)."""
+    results = []
+    if df is None or df.empty:
+        return results
+    df = main._sort_df_by_datetime(df, columns=["ESDCreated", "ESUCreated"], presorted=presorted)
+    ad_col, status_col = "ADCode", "Status"
+    fix_ready = check.evaluate_checkpoints_frame(df, document_col=ad_col)["all_pass"].tolist()
+    seen = set()
+    for pos, (_, row) in enumerate(df.iterrows()):
+        raw_doc = row[ad_col]
+        doc = str(raw_doc).strip() if raw_doc is not None else ""
+        if not doc or doc in seen:
+            continue
+        seen.add(doc)
+        status_val = None
+        raw_status = row[status_col]
+        if raw_status is not None and str(raw_status).strip() != "":
+            try:
+                status_val = int(str(raw_status).strip())
+            except Exception:
+                status_val = None
+        results.append({"document": doc, "status": status_val, "fix_ready": bool(fix_ready[pos])})
+    return results
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,50000,200000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    same = True
+    print(f"{'rows':>8} {'columnar':>11} {'iterrows':>11} {'speedup':>8}  same output")
+    for n in (int(x) for x in args.sizes.split(",")):
+        # Sorting is benchmarked separately (benchmarks.sort): compare the
+        # extraction itself on SQL-ordered input
+        df = make_frame(n)
+        new = main._extract_documents_list(df, presorted=True)
+        old = legacy_extract(df, presorted=True)
+        same &= new == old
+        t_new = _best_of(lambda: main._extract_documents_list(df, presorted=True), args.repeat)
+        t_old = _best_of(lambda: legacy_extract(df, presorted=True), 1)
+        print(f"{n:8d} {t_new * 1000:9.1f}ms {t_old * 1000:9.1f}ms {t_old / t_new:7.1f}x  {new == old}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
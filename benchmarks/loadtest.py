@@ -0,0 +1,233 @@
+"""Async load test against the app wired to the SQLite stand-in.
+
+Two workloads:
+
+- replay (--trace FILE): requests recorded by traces.TraceRecorderMiddleware
+  (TRACE_FILE) are sent again with their original spacing, divided by
+  --speed. Anonymized documents map to stand-in documents by a stable hash,
+  so a document that repeats in the trace repeats in the replay.
+- synthetic (default): --concurrency operators loop for --duration seconds,
+  picking routes by --mix (weights for search, search_doc, refresh, fix)
+  with --think seconds between requests. --sweep 1,4,16 repeats the run for
+  each operator count, which shows where /search p99 starts to climb.
+
+Requests go through the ASGI app in-process (benchmarks/asgi.py). Reports
+throughput, p50/p95/p99 and error rate per route. Non-2xx/3xx responses and
+exceptions count as errors.
+
+    python -m benchmarks.loadtest --concurrency 8 --duration 20
+    python -m benchmarks.loadtest --sweep 1,2,4,8,16 --duration 10
+    python -m benchmarks.loadtest --trace traces.jsonl --speed 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+from benchmarks import standin
+from SQL import audit
+from benchmarks.asgi import request
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    i = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[i]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # route -> [(seconds, ok)]
+
+    def add(self, route, seconds, ok):
+        self.samples.setdefault(route, []).append((seconds, ok))
+
+    def report(self, elapsed):
+        lines = [f"{'route':28} {'reqs':>6} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}"]
+        everything = []
+        for route in sorted(self.samples):
+            samples = self.samples[route]
+            everything.extend(samples)
+            lines.append(self._line(route, samples, elapsed))
+        lines.append(self._line("all", everything, elapsed))
+        return "\n".join(lines)
+
+    def summary(self, route):
+        samples = self.samples.get(route, [])
+        times = sorted(s for s, _ in samples)
+        return {"n": len(samples), "p99_ms": _percentile(times, 0.99) * 1000}
+
+    @staticmethod
+    def _line(route, samples, elapsed):
+        times = sorted(s for s, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        rate = len(samples) / elapsed if elapsed > 0 else 0.0
+        err_pct = 100.0 * errors / len(samples) if samples else 0.0
+        return (f"{route:28} {len(samples):6d} {rate:8.1f} {_percentile(times, 0.50) * 1000:7.1f}ms "
+                f"{_percentile(times, 0.95) * 1000:7.1f}ms {_percentile(times, 0.99) * 1000:7.1f}ms {err_pct:6.1f}%")
+
+
+class Target:
+    """Turns (route, params) into requests against the stand-in data."""
+
+    def __init__(self, app, summary, seed=1):
+        self.app = app
+        self.documents = summary["documents"]
+        self.fixable = list(summary["fixable"])
+        self.qr_gids = summary["qr_gids"] or [""]
+        self.rnd = random.Random(seed)
+
+    def _pick(self, values, token=None):
+        if token is None:
+            return self.rnd.choice(values)
+        h = int(hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:12], 16)
+        return values[h % len(values)]
+
+    def _fix_document(self, token=None):
+        # Prefer documents that are still fixable so /fix does real updates
+        if self.fixable:
+            return self.fixable.pop()
+        return self._pick(self.documents, token)
+
+    def build(self, method, route, params=None):
+        """Return (label, method, path, form) for one request."""
+        params = params or {}
+        doc_token = params.get("document")
+        if route == "/search" and method == "POST":
+            return "POST /search", "POST", "/search", {"document": self._pick(self.documents, doc_token)}
+        if route == "/fix":
+            return "POST /fix", "POST", "/fix", {"document": self._fix_document(doc_token)}
+        if "{document}" in route:
+            path = route.replace("{document}", self._pick(self.documents, doc_token))
+            return f"{method} {route}", method, path, None
+        if "{gid}" in route:
+            path = route.replace("{gid}", self._pick(self.qr_gids, params.get("gid")))
+            return f"{method} {route}", method, path, None
+        return f"{method} {route}", method, route, None
+
+    async def send(self, recorder, method, route, params=None):
+        label, method, path, form = self.build(method, route, params)
+        start = time.perf_counter()
+        try:
+            status, _, _ = await request(self.app, method, path, form=form)
+            ok = 200 <= status < 400
+        except Exception:
+            ok = False
+        recorder.add(label, time.perf_counter() - start, ok)
+
+
+SYNTHETIC = {
+    "search": ("POST", "/search"),
+    "search_doc": ("GET", "/search/{document}"),
+    "refresh": ("GET", "/refresh"),
+    "fix": ("POST", "/fix"),
+}
+
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SYNTHETIC:
+            raise SystemExit(f"unknown route in --mix: {name} (choose from {', '.join(SYNTHETIC)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def synthetic(target, concurrency, duration, mix, think, seed=1):
+    recorder = Recorder()
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def operator(n):
+        rnd = random.Random(seed * 1000 + n)
+        while time.perf_counter() < deadline:
+            method, route = SYNTHETIC[rnd.choices(names, weights)[0]]
+            await target.send(recorder, method, route)
+            if think:
+                await asyncio.sleep(rnd.uniform(0, 2 * think))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(operator(n) for n in range(concurrency)))
+    return recorder, time.perf_counter() - start
+
+
+async def replay(target, records, speed):
+    recorder = Recorder()
+    if not records:
+        return recorder, 0.0
+    t0 = records[0]["ts"]
+    start = time.perf_counter()
+    tasks = []
+    for rec in records:
+        delay = (rec["ts"] - t0) / speed - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(
+            target.send(recorder, rec.get("method") or "GET", rec["route"], rec.get("params"))))
+    await asyncio.gather(*tasks)
+    return recorder, time.perf_counter() - start
+
+
+def _load_trace(path):
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if rec.get("route") and rec["route"] != "<unmatched>":
+                records.append(rec)
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--trace", help="replay this TRACE_FILE instead of the synthetic mix")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed-up factor")
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated operators")
+    parser.add_argument("--sweep", help="comma-separated operator counts, one run each")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per synthetic run")
+    parser.add_argument("--mix", default="search=4,search_doc=4,refresh=1,fix=1")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between an operator's requests (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    _, summary = standin.build(documents=args.documents, seed=args.seed)
+    import main
+
+    target = Target(main.app, summary, seed=args.seed)
+    # Audit records go to stdout by default; keep the report readable
+    audit.log.path = os.getenv("AUDIT_FILE", os.devnull)
+    if args.trace:
+        records = _load_trace(args.trace)
+        recorder, elapsed = asyncio.run(replay(target, records, args.speed))
+        print(f"replayed {len(records)} requests in {elapsed:.1f}s (speed x{args.speed:g})")
+        print(recorder.report(elapsed))
+        return 0
+
+    mix = _parse_mix(args.mix)
+    levels = [int(x) for x in args.sweep.split(",")] if args.sweep else [args.concurrency]
+    knee = []
+    for level in levels:
+        recorder, elapsed = asyncio.run(synthetic(target, level, args.duration, mix, args.think, args.seed))
+        print(f"\n{level} operator(s), {elapsed:.1f}s")
+        print(recorder.report(elapsed))
+        knee.append((level, recorder.summary("POST /search")))
+    if len(knee) > 1:
+        print("\n/search p99 by operators: " + ", ".join(f"{n}: {s['p99_ms']:.1f}ms" for n, s in knee))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
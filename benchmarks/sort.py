@@ -0,0 +1,123 @@
+"""Datetime sort benchmark: vectorized _sort_df_by_datetime vs the legacy
+per-row `s.apply(_to_ts)` key.
+
+Builds auto.sql-like frames with mixed ESDCreated formats (ISO strings,
+dd/mm/yyyy strings, datetimes, blanks), checks both sorts agree, and times
+the vectorized sort at doubling sizes. Exits non-zero if the per-row cost at
+the largest size grows by more than --tolerance over the smallest (i.e. the
+sort is not roughly linear).
+
+    python -m benchmarks.sort [--sizes 12500,25000,50000,100000] [--tolerance 1.6]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import main
+
+
+def make_frame(n, seed=1):
+    rnd = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    created = []
+    for i in range(n):
+        dt = base + timedelta(seconds=rnd.randrange(0, 365 * 24 * 3600))
+        kind = i % 10
+        if kind < 6:
+            created.append(dt.strftime("%Y-%m-%d %H:%M:%S"))
+        elif kind < 8:
+            created.append(dt.strftime("%d/%m/%Y %H:%M:%S"))
+        elif kind == 8:
+            created.append(dt)
+        else:
+            created.append(None if i % 20 == 9 else "not a date")
+    return pd.DataFrame({
+        "ADCode": [f"DOC-{i}" for i in range(n)],
+        "Status": [i % 3 for i in range(n)],
+        "ESDCreated": created,
+    })
+
+
+def legacy_to_datetime(value):
+    """The original per-value parser: fromisoformat, then four strptime formats."""
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, pd.Timestamp):
+            return value.to_pydatetime()
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            s = value.strip()
+            if s.endswith("Z"):
+                s = s[:-1] + "+00:00"
+            try:
+                return datetime.fromisoformat(s)
+            except Exception:
+                pass
+            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y"):
+                try:
+                    return datetime.strptime(s, fmt)
+                except Exception:
+                    continue
+        return None
+    except Exception:
+        return None
+
+
+def legacy_sort(df, col="ESDCreated"):
+    """The pre-vectorization implementation (one legacy_to_datetime per row)."""
+    def _to_ts(v):
+        dt = legacy_to_datetime(v)
+        try:
+            return dt.timestamp() if dt is not None else float("inf")
+        except Exception:
+            return float("inf")
+
+    return df.sort_values(by=col, key=lambda s: s.apply(_to_ts), ascending=True, kind="mergesort")
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="12500,25000,50000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1.6,
+                        help="max allowed growth of per-row cost from smallest to largest size")
+    args = parser.parse_args(argv)
+    sizes = [int(x) for x in args.sizes.split(",")]
+
+    check = make_frame(5000, seed=7)
+    ok_order = main._sort_df_by_datetime(check)["ADCode"].tolist() == legacy_sort(check)["ADCode"].tolist()
+    print(f"order matches legacy sort: {ok_order}")
+
+    per_row = []
+    print(f"{'rows':>8} {'vectorized':>12} {'ns/row':>8} {'legacy':>10} {'speedup':>8}")
+    for n in sizes:
+        df = make_frame(n)
+        t_vec = _best_of(lambda: main._sort_df_by_datetime(df, columns=["ESDCreated"]), args.repeat)
+        t_old = _best_of(lambda: legacy_sort(df), 1) if n <= max(sizes) else float("nan")
+        per_row.append(t_vec / n)
+        print(f"{n:8d} {t_vec * 1000:10.1f}ms {t_vec / n * 1e9:8.0f} {t_old * 1000:8.1f}ms {t_old / t_vec:7.1f}x")
+
+    growth = per_row[-1] / per_row[0]
+    linear = growth <= args.tolerance
+    print(f"per-row cost growth {sizes[0]} -> {sizes[-1]} rows: {growth:.2f}x ({'linear' if linear else 'SUPERLINEAR'})")
+    return 0 if (ok_order and linear) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
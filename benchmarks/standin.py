@@ -0,0 +1,248 @@
+"""SQLite stand-in for the Entersoft tables used by SQL/*.sql.
+
+`build()` creates ESFIEinvoiceProviderDetails, ESFIDocumentTrade,
+ESFILineLiquidityAccount and ESFICashAccount in a SQLite file, fills them with
+synthetic documents and registers the engine as the app's default, so the
+unmodified SQL files, fetch_data/update and the FastAPI routes run without SQL
+Server. The generator is configurable:
+
+- number of documents and the share with a duplicate liquidity line
+  (checkpoint 1 fails for those);
+- Status / StatusText mix (fixable, healthy, IssueDate error, not sent);
+- QR images, stored as raw PNG bytes or as base64 text;
+- ADCode compares case-insensitively (COLLATE NOCASE), like SQL Server's
+  default collation;
+- ESDCreated in mixed text formats (ISO, ISO with T, dd/mm/yyyy). SQLite
+  compares them as text, so day-first rows never fall inside the
+  auto_page.sql lookback window. That is fine for a stand-in.
+
+T-SQL that SQLite lacks is handled in two ways. A cursor-level rewrite turns
+`TOP (n) WITH TIES` into `LIMIT n` (ties are not kept) and drops
+`CAST(x AS datetime)`. Statements that need more (UPDATE ... OUTPUT in
+fix_cas.sql) have a SQLite twin in benchmarks/standin_sql/ that is read
+instead of the SQL/ file of the same name.
+
+    python -m benchmarks.standin [--documents 2000]   # build and print a summary
+"""
+
+import argparse
+import base64
+import os
+import random
+import re
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+from SQL import check, fetch_data, sql_connect, update
+
+SUCCESS_TEXTS = check.SUCCESS_MARKERS
+SPECIAL_ERROR = "Aade Validation Error: IssueDate is invalid, it must be equal with current date"
+OTHER_TEXTS = ("Timeout while calling provider", "Invalid VAT number")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# SQL files replaced by a SQLite twin from benchmarks/standin_sql/
+OVERRIDES = {"fix_cas.sql"}
+_OVERRIDE_DIR = os.path.join("..", "benchmarks", "standin_sql")  # relative to SQL/
+
+SCHEMA = (
+    """CREATE TABLE ESFIDocumentTrade (
+        GID TEXT PRIMARY KEY, ADCode TEXT COLLATE NOCASE, ESDCreated TEXT, ESUCreated TEXT,
+        CurrencyNetValue REAL, CurrencyTotalValue REAL, CurrencyVATValue REAL)""",
+    """CREATE TABLE ESFIEinvoiceProviderDetails (
+        fDocumentGID TEXT PRIMARY KEY, Status INT, Statuscode TEXT, IssueDate TEXT,
+        ESDCreated TEXT, UID TEXT, AuthenticationCode TEXT, MarkID TEXT,
+        ProviderName TEXT, QRCode BLOB, InvoiceURL TEXT, StatusText TEXT)""",
+    """CREATE TABLE ESFILineLiquidityAccount (
+        fDocumentGID TEXT, fLiquidityAccountGID TEXT, AuthorizationID TEXT)""",
+    """CREATE TABLE ESFICashAccount (GID TEXT PRIMARY KEY, fCashAccountTypeCode TEXT)""",
+    "CREATE INDEX ix_trade_adcode ON ESFIDocumentTrade (ADCode)",
+    "CREATE INDEX ix_trade_created ON ESFIDocumentTrade (ESDCreated, GID)",
+    "CREATE INDEX ix_line_doc ON ESFILineLiquidityAccount (fDocumentGID)",
+)
+
+CASH_ACCOUNTS = (("CA-CASH", "ΜΕΤ"), ("CA-CARD", "ΚΑΡ"), ("CA-BANK", "ΤΡΑ"))
+
+_TOP = re.compile(r"SELECT\s+TOP\s*\(\s*\?\s*\)\s+WITH\s+TIES", re.IGNORECASE)
+_CAST_DATETIME = re.compile(r"CAST\(\s*\?\s+AS\s+datetime\s*\)", re.IGNORECASE)
+
+
+def _rewrite(conn, cursor, statement, parameters, context, executemany):
+    """before_cursor_execute hook: T-SQL constructs -> SQLite."""
+    m = _TOP.search(statement)
+    if m:
+        # The TOP placeholder moves to a trailing LIMIT, so its parameter moves too
+        pos = statement[:m.start()].count("?")
+        params = list(parameters)
+        page_size = params.pop(pos)
+        statement = statement[:m.start()] + "SELECT" + statement[m.end():].rstrip().rstrip(";") + "\nLIMIT ?"
+        parameters = tuple(params) + (page_size,)
+    if "CAST(" in statement.upper():
+        statement = _CAST_DATETIME.sub("?", statement)
+    return statement, parameters
+
+
+def _install_overrides():
+    """Serve OVERRIDES from benchmarks/standin_sql/ to fetch_data and update."""
+    for module in (fetch_data, update):
+        original = module._read_query
+        if getattr(original, "standin", False):
+            continue
+
+        def read_query(sfile, *args, _original=original):
+            if os.path.basename(str(sfile)) in OVERRIDES:
+                sfile = os.path.join(_OVERRIDE_DIR, os.path.basename(str(sfile)))
+            return _original(sfile, *args)
+
+        read_query.standin = True
+        module._read_query = read_query
+
+
+def create_engine(path=None):
+    """SQLite engine (WAL, pooled) with the T-SQL rewrite installed."""
+    from sqlalchemy import create_engine as sa_create_engine, event
+
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="ecos-standin-"), "standin.db")
+    engine = sa_create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=8,
+        max_overflow=8,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=OFF")
+
+    event.listen(engine, "before_cursor_execute", _rewrite, retval=True)
+    return engine
+
+
+def _fake_png(rnd, size):
+    return PNG_SIGNATURE + bytes(rnd.getrandbits(8) for _ in range(max(size - 8, 0)))
+
+
+def _format_created(dt, rnd, day_first_rate, t_rate):
+    r = rnd.random()
+    if r < day_first_rate:
+        return dt.strftime("%d/%m/%Y %H:%M:%S")
+    if r < day_first_rate + t_rate:
+        return dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def populate(
+    engine,
+    documents=1000,
+    dup_rate=0.1,
+    qr_rate=0.6,
+    qr_bytes=1500,
+    day_first_rate=0.1,
+    t_rate=0.2,
+    days=20,
+    seed=1,
+    now=None,
+):
+    """Fill the stand-in tables. Returns a summary with sample document codes:
+    {"documents", "fixable", "wrong_login_day", "healthy", "duplicates", "qr_gids"}.
+    """
+    from sqlalchemy import text
+
+    rnd = random.Random(seed)
+    now = now or datetime.now()
+    trade, details, lines = [], [], []
+    summary = {"documents": [], "fixable": [], "wrong_login_day": [], "healthy": [],
+               "duplicates": [], "qr_gids": []}
+
+    for i in range(documents):
+        gid = str(uuid.UUID(int=rnd.getrandbits(128)))
+        code = f"DOC-{i:06d}"
+        created = now - timedelta(seconds=rnd.randrange(0, days * 24 * 3600))
+        created_text = _format_created(created, rnd, day_first_rate, t_rate)
+        status = rnd.choices((0, 1, 2), weights=(5, 3, 2))[0]
+        kind = rnd.random()
+        if kind < 0.6:
+            status_text = rnd.choice(SUCCESS_TEXTS)
+        elif kind < 0.7:
+            status_text = SPECIAL_ERROR
+        else:
+            status_text = rnd.choice(OTHER_TEXTS)
+        net = round(rnd.uniform(1, 500), 2)
+        vat = round(net * 0.24, 2)
+        trade.append({"gid": gid, "code": code, "created": created_text,
+                      "user": f"operator{rnd.randrange(1, 6)}", "net": net, "total": net + vat, "vat": vat})
+
+        qr = None
+        if rnd.random() < qr_rate:
+            png = _fake_png(rnd, qr_bytes)
+            qr = png if rnd.random() < 0.5 else base64.b64encode(png).decode("ascii")
+            summary["qr_gids"].append(gid)
+        details.append({
+            "gid": gid, "status": status, "statuscode": "1", "created": created_text,
+            "uid": f"{rnd.getrandbits(40):X}", "auth": f"{rnd.getrandbits(64):X}",
+            "mark": str(400000000000000 + i),
+            "provider": "Impact" if rnd.random() < 0.9 else "Other",
+            "qr": qr, "url": f"einvoice.impact.gr/v/{gid}", "text": status_text,
+        })
+
+        cash_gid, cash_code = rnd.choice(CASH_ACCOUNTS)
+        auth_id = f"A{rnd.getrandbits(32):08X}" if cash_code == "ΚΑΡ" else None
+        copies = 2 if rnd.random() < dup_rate else 1
+        for _ in range(copies):
+            lines.append({"gid": gid, "cash": cash_gid, "auth": auth_id})
+
+        summary["documents"].append(code)
+        if copies > 1:
+            summary["duplicates"].append(code)
+        elif status == 0 and status_text in SUCCESS_TEXTS:
+            summary["fixable"].append(code)
+        elif status == 0 and status_text == SPECIAL_ERROR:
+            summary["wrong_login_day"].append(code)
+        elif status != 0:
+            summary["healthy"].append(code)
+
+    with engine.begin() as conn:
+        for ddl in SCHEMA:
+            conn.exec_driver_sql(ddl)
+        conn.execute(text("INSERT INTO ESFICashAccount VALUES (:g, :c)"),
+                     [{"g": g, "c": c} for g, c in CASH_ACCOUNTS])
+        conn.execute(text("INSERT INTO ESFIDocumentTrade VALUES (:gid, :code, :created, :user, :net, :total, :vat)"),
+                     trade)
+        conn.execute(text(
+            "INSERT INTO ESFIEinvoiceProviderDetails VALUES "
+            "(:gid, :status, :statuscode, NULL, :created, :uid, :auth, :mark, :provider, :qr, :url, :text)"
+        ), details)
+        conn.execute(text("INSERT INTO ESFILineLiquidityAccount VALUES (:gid, :cash, :auth)"), lines)
+    return summary
+
+
+def build(path=None, register=True, **options):
+    """Create, fill and (by default) register the stand-in. Returns (engine, summary)."""
+    engine = create_engine(path)
+    summary = populate(engine, **options)
+    _install_overrides()
+    if register:
+        sql_connect.register_engine(engine)
+    return engine, summary
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--path", default=None, help="SQLite file to create (default: a temp file)")
+    args = parser.parse_args(argv)
+
+    engine, summary = build(path=args.path, documents=args.documents)
+    print(f"stand-in database: {engine.url.database}")
+    for key, values in summary.items():
+        print(f"{key:16} {len(values)}")
+    rows = fetch_data.get_sql_rows("check.sql", {"document": summary["fixable"][0]})
+    print(f"check.sql on {summary['fixable'][0]}: {len(rows or [])} row(s)")
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
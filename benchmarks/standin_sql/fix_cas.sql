@@ -0,0 +1,46 @@
+-- SQLite twin of SQL/fix_cas.sql for the benchmark stand-in (benchmarks/standin.py).
+-- Same guards and parameters; RETURNING replaces OUTPUT ... INTO, and the joined columns
+-- come from correlated subqueries because SQLite's RETURNING only sees the
+-- updated table.
+
+UPDATE ESFIEinvoiceProviderDetails
+SET
+    Status = 1
+WHERE fDocumentGID IN (
+        SELECT t.GID FROM ESFIDocumentTrade t WHERE t.adcode = :document
+    )
+    AND Status = 0
+    AND (
+        StatusText LIKE :success_1
+        OR StatusText LIKE :success_2
+    )
+    AND (
+        SELECT COUNT(*)
+        FROM ESFIEinvoiceProviderDetails d2
+        JOIN ESFIDocumentTrade t2
+            ON d2.fdocumentgid = t2.GID
+        LEFT JOIN ESFILineLiquidityAccount L2
+            ON t2.GID = L2.fDocumentGID
+        LEFT JOIN ESFICashAccount AS CA2
+            ON L2.fLiquidityAccountGID = CA2.GID
+        WHERE t2.adcode = :document
+    ) = 1
+RETURNING
+    (SELECT t.ADCode FROM ESFIDocumentTrade t WHERE t.GID = ESFIEinvoiceProviderDetails.fDocumentGID) AS ADCode,
+    Status,
+    fDocumentGID,
+    UID,
+    AuthenticationCode,
+    MarkID,
+    ProviderName,
+    CASE WHEN QRCode IS NULL THEN 0 ELSE 1 END AS HasQRCode,
+    InvoiceURL,
+    (SELECT t.ESDCreated FROM ESFIDocumentTrade t WHERE t.GID = ESFIEinvoiceProviderDetails.fDocumentGID) AS ESDCreated,
+    (SELECT t.ESUCreated FROM ESFIDocumentTrade t WHERE t.GID = ESFIEinvoiceProviderDetails.fDocumentGID) AS ESUCreated,
+    (SELECT t.CurrencyNetValue FROM ESFIDocumentTrade t WHERE t.GID = ESFIEinvoiceProviderDetails.fDocumentGID) AS CurrencyNetValue,
+    (SELECT t.CurrencyTotalValue FROM ESFIDocumentTrade t WHERE t.GID = ESFIEinvoiceProviderDetails.fDocumentGID) AS CurrencyTotalValue,
+    (SELECT t.CurrencyVATValue FROM ESFIDocumentTrade t WHERE t.GID = ESFIEinvoiceProviderDetails.fDocumentGID) AS CurrencyVATValue,
+    (SELECT CA.fCashAccountTypeCode FROM ESFILineLiquidityAccount L JOIN ESFICashAccount CA ON L.fLiquidityAccountGID = CA.GID
+        WHERE L.fDocumentGID = ESFIEinvoiceProviderDetails.fDocumentGID) AS fCashAccountTypeCode,
+    (SELECT L.AuthorizationID FROM ESFILineLiquidityAccount L WHERE L.fDocumentGID = ESFIEinvoiceProviderDetails.fDocumentGID) AS AuthorizationID,
+    StatusText
@@ -0,0 +1,85 @@
+"""Startup-time benchmark.
+
+Measures, in fresh interpreter processes:
+- cold start: time to `import main`
+- time to first `/`: import main and serve GET / through the ASGI app
+
+and checks that no database driver or pandas was imported on the way.
+Exits non-zero if the median exceeds the budget, so it can gate CI.
+
+    python -m benchmarks.startup [--runs 5] [--budget 1.5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("pandas", "sqlalchemy", "pyodbc")
+
+_PROBE = r"""
+import asyncio, sys, time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter() - t0
+t_first = None
+if {serve!r}:
+    from benchmarks.asgi import request
+    status, _, _ = asyncio.run(request(main.app, "GET", "/"))
+    assert status == 200, status
+    t_first = time.perf_counter() - t0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(t_import, t_first, ",".join(heavy), sep="|")
+"""
+
+
+def _run_probe(serve):
+    code = _PROBE.format(serve=serve, heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip().splitlines()[-1]
+    t_import, t_first, heavy = out.split("|")
+    return float(t_import), (None if t_first == "None" else float(t_first)), [m for m in heavy.split(",") if m]
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=float(os.getenv("STARTUP_BUDGET_S", "1.5")),
+                        help="seconds allowed for the median time to first / (default 1.5)")
+    args = parser.parse_args(argv)
+
+    imports, firsts, heavy_seen = [], [], set()
+    for _ in range(args.runs):
+        t_import, t_first, heavy = _run_probe(serve=True)
+        imports.append(t_import)
+        firsts.append(t_first)
+        heavy_seen.update(heavy)
+
+    med_import = statistics.median(imports)
+    med_first = statistics.median(firsts)
+    print(f"cold start (import main): median {med_import * 1000:8.1f} ms  max {max(imports) * 1000:8.1f} ms")
+    print(f"time to first /         : median {med_first * 1000:8.1f} ms  max {max(firsts) * 1000:8.1f} ms")
+    print(f"budget                  : {args.budget * 1000:8.1f} ms")
+
+    failed = False
+    if heavy_seen:
+        print(f"FAIL: imported at startup: {', '.join(sorted(heavy_seen))}")
+        failed = True
+    if med_first > args.budget:
+        print("FAIL: time to first / is over budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,190 @@
+"""Benchmark suite on the SQLite stand-in (benchmarks/standin.py).
+
+Builds a stand-in database (--documents), then times the hot paths with the
+real SQL files:
+
+- fetch_data.get_sql_data on auto.sql (full list) and auto_page.sql (one page)
+- fetch_data.get_sql_rows on check.sql
+- build_card_context and check.evaluate_checkpoints on check.sql rows
+- _extract_documents_list on the full auto.sql frame
+- POST /search, GET /search/{document}, GET /qr/{gid} (cold image cache)
+- GET /fragments/card/{document}, cold and from the rendered-card cache
+- POST /fix in FIX_MODE=classic and cas, each call on a different fixable document
+
+Prints median/p95/mean per case. --save writes the medians to a JSON file and
+--baseline compares against one, failing if any case got slower than
+--tolerance times its baseline median. Keep one baseline per machine.
+
+    python -m benchmarks.suite [--documents 5000] [--iterations 30] [--save base.json | --baseline base.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from benchmarks import standin
+from SQL import audit
+from benchmarks.asgi import request
+
+
+def _stats(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    return {
+        "n": len(samples),
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": p95 * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+    }
+
+
+def _measure(fn, iterations, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return _stats(samples)
+
+
+async def _measure_async(make_call, iterations, warmup=1):
+    for i in range(warmup):
+        await make_call(i)
+    samples = []
+    for i in range(warmup, warmup + iterations):
+        start = time.perf_counter()
+        status = await make_call(i)
+        samples.append(time.perf_counter() - start)
+        assert status == 200, status
+    return _stats(samples)
+
+
+def _cases(summary, iterations):
+    import main
+    from SQL import check, fetch_data
+
+    docs = summary["documents"]
+    lookups = [docs[i * 7 % len(docs)] for i in range(iterations + 1)]
+    rows_by_doc = {d: fetch_data.get_sql_rows(main.SQL_FILES["check"], {"document": d}) for d in lookups}
+    auto_df = fetch_data.get_sql_data(main.SQL_FILES["auto"])
+    page_params = {
+        "page_size": main.CANDIDATE_PAGE_SIZE,
+        "since": main.datetime.now() - main.timedelta(days=main.CANDIDATE_LOOKBACK_DAYS),
+        "after_created": None,
+        "after_gid": None,
+    }
+    it = iter(range(10 ** 9))
+
+    def next_doc():
+        return lookups[next(it) % len(lookups)]
+
+    results = {}
+    results["get_sql_data auto.sql"] = _measure(lambda: fetch_data.get_sql_data(main.SQL_FILES["auto"]), iterations)
+    results["get_sql_data auto_page.sql"] = _measure(
+        lambda: fetch_data.get_sql_data(main.SQL_FILES["auto_page"], page_params), iterations)
+    results["get_sql_rows check.sql"] = _measure(
+        lambda: fetch_data.get_sql_rows(main.SQL_FILES["check"], {"document": next_doc()}), iterations)
+    results["build_card_context"] = _measure(
+        lambda: (lambda d: main.build_card_context(rows_by_doc[d], d))(next_doc()), iterations)
+    results["evaluate_checkpoints"] = _measure(
+        lambda: check.evaluate_checkpoints(rows_by_doc[next_doc()]), iterations)
+    results["_extract_documents_list auto.sql"] = _measure(
+        lambda: main._extract_documents_list(auto_df), iterations)
+    return results
+
+
+async def _route_cases(summary, iterations):
+    import main
+
+    docs = summary["documents"]
+    results = {}
+    results["POST /search"] = await _measure_async(
+        lambda i: _status(request(main.app, "POST", "/search", form={"document": docs[i * 11 % len(docs)]})),
+        iterations)
+    results["GET /search/{document}"] = await _measure_async(
+        lambda i: _status(request(main.app, "GET", f"/search/{docs[i * 13 % len(docs)]}")), iterations)
+
+
+    async def card_fragment(i, cold):
+        if cold:
+            main._card_cache.invalidate()
+        return await _status(request(main.app, "GET", f"/fragments/card/{docs[i * 17 % len(docs)]}"))
+    results["GET /fragments/card (cold)"] = await _measure_async(lambda i: card_fragment(i, True), iterations)
+    # Same documents again: every card is now cached
+    results["GET /fragments/card (cached)"] = await _measure_async(lambda i: card_fragment(i, False), iterations)
+
+    gids = summary["qr_gids"]
+
+    async def qr(i):
+        main._qr_cache.invalidate()
+        return await _status(request(main.app, "GET", f"/qr/{gids[i % len(gids)]}"))
+    results["GET /qr/{gid} (cold)"] = await _measure_async(qr, iterations)
+
+    # Every fix consumes a fixable document: split them between the two modes
+    fixable = list(summary["fixable"])
+    per_mode = max(min(iterations, (len(fixable) - 2) // 2), 1)
+    for mode in ("classic", "cas"):
+        main.FIX_MODE = mode
+        batch = [fixable.pop() for _ in range(per_mode + 1)]
+        results[f"POST /fix ({mode})"] = await _measure_async(
+            lambda i: _status(request(main.app, "POST", "/fix", form={"document": batch[i]})), per_mode)
+    main.FIX_MODE = "classic"
+    return results
+
+
+async def _status(call):
+    status, _, _ = await call
+    return status
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write medians to this JSON file")
+    parser.add_argument("--baseline", help="compare medians against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="max allowed median / baseline median before a case fails")
+    args = parser.parse_args(argv)
+
+    _, summary = standin.build(documents=args.documents, seed=args.seed)
+    # Audit records go to stdout by default; keep the report readable
+    audit.log.path = os.getenv("AUDIT_FILE", os.devnull)
+    results = _cases(summary, args.iterations)
+    results.update(asyncio.run(_route_cases(summary, args.iterations)))
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    failed = False
+    print(f"{args.documents} documents, {args.iterations} iterations")
+    print(f"{'case':36} {'median':>9} {'p95':>9} {'mean':>9} {'vs base':>8}")
+    for name, s in results.items():
+        ratio = ""
+        if name in baseline:
+            r = s["median_ms"] / baseline[name] if baseline[name] else 0.0
+            slow = r > args.tolerance
+            failed |= slow
+            ratio = f"{r:6.2f}x{' !' if slow else ''}"
+        print(f"{name:36} {s['median_ms']:7.2f}ms {s['p95_ms']:7.2f}ms {s['mean_ms']:7.2f}ms {ratio:>8}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({name: round(s["median_ms"], 3) for name, s in results.items()}, f, indent=2)
+        print(f"saved medians to {args.save}")
+    if failed:
+        print(f"FAIL: slower than {args.tolerance}x baseline")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,153 @@
+"""Response compression for HTML, JSON, CSS and SVG.
+
+`CompressionMiddleware` compresses a response when the client sends a matching
+Accept-Encoding. It uses brotli ("br") if the optional `brotli` package is
+installed and gzip otherwise. A response is compressed only if its
+Content-Type is in COMPRESSIBLE and its body is at least COMPRESS_MIN_BYTES
+(default 500). Responses that are already encoded are left alone. So are
+images (PNG/JPEG are compressed already) and the SSE stream, which must not be
+buffered. The ETag of a compressed response, and of any 304 to a client that
+accepts compression, is made weak (W/"..."). COMPRESSION=0 turns compression
+off.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+COMPRESSIBLE = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+
+
+def _env_bool(name, default):
+    v = os.getenv(name)
+    if v is None or str(v).strip() == "":
+        return default
+    return str(v).strip().lower() in {"1", "yes", "true", "on"}
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _accepted(header):
+    """Codings with q > 0 from an Accept-Encoding value."""
+    codings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            codings.add(name.strip().lower())
+    return codings
+
+
+def choose_encoding(accept_encoding):
+    codings = _accepted(accept_encoding or "")
+    if brotli is not None and "br" in codings:
+        return "br"
+    if "gzip" in codings or "*" in codings:
+        return "gzip"
+    return None
+
+
+def _weak_etags(headers):
+    """A compressed body is not byte-identical to the identity one, so its
+    ETag may only be a weak validator."""
+    return [
+        (k, b"W/" + v if k.lower() == b"etag" and not v.startswith(b"W/") else v)
+        for k, v in headers
+    ]
+
+
+def compress(body, encoding, gzip_level=6, brotli_quality=5):
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware; it buffers only the responses it will compress."""
+
+    def __init__(self, app, minimum_size=None, enabled=None):
+        self.app = app
+        self.minimum_size = _env_int("COMPRESS_MIN_BYTES", 500) if minimum_size is None else minimum_size
+        self.enabled = _env_bool("COMPRESSION", True) if enabled is None else enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for k, v in scope.get("headers", []):
+            if k == b"accept-encoding":
+                accept = v.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        buffering = False
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start, buffering
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                ctype = headers.get(b"content-type", b"").split(b";")[0].strip().decode("latin-1").lower()
+                buffering = (
+                    ctype in COMPRESSIBLE
+                    and b"content-encoding" not in headers
+                    and message["status"] not in (204, 304)
+                )
+                if buffering:
+                    start = message
+                else:
+                    if message["status"] == 304:
+                        # The client may hold the compressed variant: revalidate
+                        # with the same (weak) validator it was given
+                        message = {**message, "headers": _weak_etags(message.get("headers", []))}
+                    await send(message)
+                return
+            if not buffering or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            buffering = False
+            body = b"".join(chunks)
+            headers = [(k, v) for k, v in start.get("headers", []) if k.lower() not in (b"content-length", b"vary")]
+            vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+            headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers = _weak_etags(headers)
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
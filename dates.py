@@ -0,0 +1,149 @@
+"""Shared date parsing/formatting for cards, badges and list sorting.
+
+Values from the ERP arrive as datetimes, pandas Timestamps or strings in a
+handful of formats. `DateParser` learns which format parses each source
+column (e.g. "ESDCreated"), caches it and tries it first next time, so a
+steady column costs one parse attempt per value instead of a cascade of
+failing fromisoformat/strptime calls. Formatting goes through a precompiled
+formatter instead of strftime.
+"""
+
+import re
+import sys
+from datetime import datetime
+
+ISO = "iso"
+
+# Parse functions per format name; each returns a datetime or raises ValueError.
+# Day-first formats use precompiled regexes (much cheaper than strptime).
+_DMY_TIME = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4}) (\d{1,2}):(\d{2}):(\d{2})\Z")
+_DMY = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})\Z")
+
+
+def _parse_iso(s):
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    return datetime.fromisoformat(s)
+
+
+def _parse_dmy_time(s):
+    m = _DMY_TIME.match(s)
+    if not m:
+        raise ValueError(s)
+    d, mo, y, h, mi, sec = map(int, m.groups())
+    return datetime(y, mo, d, h, mi, sec)
+
+
+def _parse_dmy(s):
+    m = _DMY.match(s)
+    if not m:
+        raise ValueError(s)
+    d, mo, y = map(int, m.groups())
+    return datetime(y, mo, d)
+
+
+# Order matters only for the first value of a column; afterwards the learned
+# format goes first. ISO (fromisoformat) also covers "%Y-%m-%d %H:%M:%S" and "%Y-%m-%d".
+_PARSERS = {
+    ISO: _parse_iso,
+    "%d/%m/%Y %H:%M:%S": _parse_dmy_time,
+    "%d/%m/%Y": _parse_dmy,
+}
+# The same formats for pandas.to_datetime (vectorized path)
+_PANDAS_FORMATS = {
+    ISO: "ISO8601",
+    "%d/%m/%Y %H:%M:%S": "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y": "%d/%m/%Y",
+}
+
+
+def _compile_formatter(pattern):
+    """Turn a small strftime pattern (%d %m %Y %H %M %S only) into a function."""
+    fields = {
+        "d": "{0.day:02d}", "m": "{0.month:02d}", "Y": "{0.year:04d}",
+        "H": "{0.hour:02d}", "M": "{0.minute:02d}", "S": "{0.second:02d}",
+    }
+    template = re.sub(r"%([dmYHMS])", lambda m: fields[m.group(1)], pattern.replace("{", "{{").replace("}", "}}"))
+    return template.format
+
+
+class DateParser:
+    def __init__(self, display_format="%d.%m.%Y • %H:%M:%S"):
+        self._learned = {}  # column name -> format name that parsed it last
+        self._display = _compile_formatter(display_format)
+
+    def learned_format(self, column):
+        return self._learned.get(column)
+
+    def _candidates(self, column):
+        first = self._learned.get(column)
+        if first is None:
+            return _PARSERS
+        return {first: _PARSERS[first], **{k: v for k, v in _PARSERS.items() if k != first}}
+
+    def parse(self, value, column=None):
+        """Return a datetime for a date-like value, or None if not parseable."""
+        if value is None or value == "":
+            return None
+        if isinstance(value, datetime):
+            # pandas Timestamp is a datetime subclass
+            return value.to_pydatetime() if hasattr(value, "to_pydatetime") else value
+        if not isinstance(value, str):
+            return None
+        s = value.strip()
+        for name, parse in self._candidates(column).items():
+            try:
+                dt = parse(s)
+            except (ValueError, TypeError):
+                continue
+            if column is not None:
+                self._learned[column] = name
+            return dt
+        return None
+
+    def format(self, value, column=None):
+        """Format to 'dd.mm.yyyy • hh:mm:ss'; unparseable values come back as str(value)."""
+        if value is None or value == "":
+            return None
+        dt = self.parse(value, column)
+        if dt is None:
+            return str(value)
+        return self._display(dt)
+
+    def sort_key(self, series):
+        """Vectorized counterpart of parse() for a pandas Series: naive UTC
+        datetime64 values, NaT where nothing parses. The column's learned
+        format is applied first with one to_datetime call; only the values it
+        misses are tried with the remaining formats.
+        """
+        pd = sys.modules["pandas"]  # a Series implies pandas is loaded
+        if pd.api.types.is_datetime64_any_dtype(series):
+            if getattr(series.dt, "tz", None) is None:
+                return series
+            return series.dt.tz_convert("UTC").dt.tz_localize(None)
+
+        text = series.astype("string").str.strip()
+        parsed = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns, UTC]")
+        remaining = text.notna() & text.ne("")
+        best, best_hits = None, 0
+        for name in self._candidates(series.name):
+            if not remaining.any():
+                break
+            try:
+                attempt = pd.to_datetime(text[remaining], format=_PANDAS_FORMATS[name], errors="coerce", utc=True)
+            except (ValueError, TypeError):
+                continue
+            hits = attempt.notna()
+            n_hits = int(hits.sum())
+            if n_hits:
+                parsed.loc[attempt.index[hits]] = attempt[hits]
+                remaining.loc[attempt.index[hits]] = False
+                if n_hits > best_hits:
+                    best, best_hits = name, n_hits
+        if best is not None and series.name is not None:
+            self._learned[series.name] = best
+        return parsed.dt.tz_localize(None)
+
+
+# Process-wide parser shared by card building and list sorting
+parser = DateParser()
@@ -0,0 +1,118 @@
+"""Server-Sent Events feed for the live candidate list.
+
+A single poller task loads the candidate list every `interval` seconds while
+at least one browser is connected, diffs it against the previous snapshot and
+pushes only the added/removed entries to every subscriber. N open tabs cost
+one query per interval instead of N full-page reloads of /refresh.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+
+
+def _key(item):
+    return item.get("document"), item.get("status"), item.get("fix_ready")
+
+
+def format_event(event, data):
+    """Encode one SSE message."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class CandidateFeed:
+    def __init__(self, loader, interval=15.0, queue_size=100):
+        # loader: async callable returning the current list of
+        # {"document", "status"} dicts, or None if the query failed
+        self.loader = loader
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._snapshot = None
+        self._task = None
+        # poke() and the poller both poll: one at a time, so each diffs
+        # against the snapshot the other published
+        self._lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """Register a browser; returns its queue of (event, data) messages.
+        The first message is always the full snapshot (if one is known).
+        """
+        q = asyncio.Queue(maxsize=self.queue_size)
+        if self._snapshot is not None:
+            q.put_nowait(("snapshot", {"items": self._snapshot}))
+        self._subscribers.add(q)
+        if self._task is None or self._task.done():
+            # Fresh context: the poller outlives the request that started it
+            # and must not record into its per-request state (timing spans)
+            self._task = asyncio.create_task(self._poll(), context=contextvars.Context())
+        return q
+
+    def unsubscribe(self, q):
+        self._subscribers.discard(q)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, event, data):
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and resync it with a snapshot
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(("snapshot", {"items": self._snapshot or []}))
+
+    def _diff(self, items):
+        old = {_key(i): i for i in (self._snapshot or [])}
+        new = {_key(i): i for i in items}
+        added = [i for k, i in new.items() if k not in old]
+        removed = [i for k, i in old.items() if k not in new]
+        return added, removed
+
+    async def poll_once(self):
+        """Load the list once and publish what changed (returns True if anything did)."""
+        async with self._lock:
+            items = await self.loader()
+            if items is None:
+                return False
+            if self._snapshot is None:
+                self._snapshot = list(items)
+                self._publish("snapshot", {"items": self._snapshot})
+                return True
+            added, removed = self._diff(items)
+            self._snapshot = list(items)
+            if added or removed:
+                self._publish("changes", {"added": added, "removed": removed})
+                return True
+            return False
+
+    def poke(self):
+        """Poll now (e.g. right after a fix) if any browser is listening."""
+        if self._subscribers:
+            asyncio.create_task(self.poll_once(), context=contextvars.Context())
+
+    async def _poll(self):
+        while self._subscribers:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.exception("Candidate feed poll failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
@@ -1,120 +1,171 @@
+import os
 import socket
+import sys
+import asyncio
 import base64
 import binascii
+import hashlib
+import json
+import math
 import re
-from datetime import datetime
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from urllib.parse import quote
 
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from SQL import fetch_data, check
+from markupsafe import Markup
+from pydantic import BaseModel
+from SQL import fetch_data, check, executor, sql_connect, cache, update, health, metrics, audit, shared_cache
 from SQL import set as sql_set
+import assets
+import compression
+import dates
+import events
+import timing
+import traces
 
 # Centralized SQL file registry for maintainability
 SQL_FILES = {
     "check": "check.sql",
     "set": "set.sql",
     "auto": "auto.sql",
+    "auto_page": "auto_page.sql",
     "update_wrong_login_day": "update_wrong_login_day.sql",
+    "check_many": "check_many.sql",
+    "qr": "qr.sql",
+    "fix_cas": "fix_cas.sql",
 }
 
-app = FastAPI(title="ECOS Document Fix Tool")
 
-# Mount static and images
-app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/images", StaticFiles(directory="images"), name="images")
-
-templates = Jinja2Templates(directory="templates")
-
-
-def _format_datetime(value):
-    """Format various date-like inputs to 'dd.mm.yyyy • hh:mm:ss'. Returns None if not parseable."""
-    if value is None or value == "":
-        return None
+def _env_float(name, default):
     try:
-        # pandas Timestamp support (optional)
-        try:
-            import pandas as pd  # type: ignore
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
 
-            if isinstance(value, pd.Timestamp):
-                value = value.to_pydatetime()
-        except Exception:
-            pass
 
-        if isinstance(value, datetime):
-            return value.strftime("%d.%m.%Y • %H:%M:%S")
-        if isinstance(value, str):
-            s = value.strip()
-            # Normalize 'Z' suffix to offset for fromisoformat
-            if s.endswith("Z"):
-                s = s[:-1] + "+00:00"
-            # Try ISO first
-            try:
-                dt = datetime.fromisoformat(s)
-                return dt.strftime("%d.%m.%Y • %H:%M:%S")
-            except Exception:
-                pass
-            # Try a few common formats
-            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y"):
-                try:
-                    dt = datetime.strptime(s, fmt)
-                    return dt.strftime("%d.%m.%Y • %H:%M:%S")
-                except Exception:
-                    continue
-        # Fallback string
-        return str(value)
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Candidate list (auto.sql) cache: served fresh for AUTO_CACHE_TTL seconds, then
+# served stale while a background refresh runs, up to AUTO_CACHE_STALE seconds
+_auto_cache = cache.TTLCache(
+    ttl=_env_float("AUTO_CACHE_TTL", 30.0),
+    stale_ttl=_env_float("AUTO_CACHE_STALE", 300.0),
+)
+
+# Cross-worker cache (SHARED_CACHE_FILE, see SQL/shared_cache.py): workers share
+# candidate pages and document lookups; a fix bumps the tags for all of them
+CANDIDATES_TAG = "candidates"
+shared_cache.register(SQL_FILES["auto"], CANDIDATES_TAG)
+shared_cache.register(SQL_FILES["auto_page"], CANDIDATES_TAG)
+shared_cache.register(SQL_FILES["check"], lambda params: shared_cache.document_tag(params["document"]))
+
+# Candidate list paging: only documents created in the last
+# CANDIDATE_LOOKBACK_DAYS days, CANDIDATE_PAGE_SIZE rows per page
+CANDIDATE_LOOKBACK_DAYS = _env_int("CANDIDATE_LOOKBACK_DAYS", 30)
+CANDIDATE_PAGE_SIZE = _env_int("CANDIDATE_PAGE_SIZE", 50)
+# How /fix applies a fix: "classic" reads the document, evaluates the
+# checkpoints in Python and updates by GID; "cas" runs one guarded
+# UPDATE ... OUTPUT (SQL/fix_cas.sql) that checks and returns the row at once
+FIX_MODE = os.getenv("FIX_MODE", "classic").strip().lower()
+# Decoded QR images served by /qr/{gid}, capped at QR_CACHE_BYTES in total
+_qr_cache = cache.ByteLRU(_env_int("QR_CACHE_BYTES", 8 * 1024 * 1024))
+# Rendered card sections (_card.html) keyed by GID + row fingerprint, capped
+# at CARD_CACHE_BYTES in total; see _card_html
+_card_cache = cache.ByteLRU(_env_int("CARD_CACHE_BYTES", 4 * 1024 * 1024))
+# Upper bound on documents per /api/fix/batch call (keeps the IN list well
+# under SQL Server's 2100 parameter limit)
+BATCH_FIX_MAX = _env_int("BATCH_FIX_MAX", 500)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await candidate_feed.stop()
+    health.stop()
+    # Write out queued audit and trace records before the process exits
+    audit.close()
+    traces.close()
+    # Release DB worker threads and pooled connections on shutdown/reload
+    executor.shutdown()
+    sql_connect.dispose_engines()
+
+
+app = FastAPI(title="ECOS Document Fix Tool", lifespan=lifespan)
+
+# Mount static and images; templates link them with content-hash URLs
+# (asset(...)) that are served as immutable, see assets.py
+app.mount("/static", assets.FingerprintedStaticFiles(directory="static", prefix="/static"), name="static")
+app.mount("/images", assets.FingerprintedStaticFiles(directory="images", prefix="/images"), name="images")
+
+# Server-Timing breakdown per request (sql, sort, card, qr, render; see timing.py)
+app.add_middleware(timing.ServerTimingMiddleware)
+# Anonymized request traces for load-test replay, only when TRACE_FILE is set
+app.add_middleware(traces.TraceRecorderMiddleware)
+# gzip/brotli for HTML, JSON, CSS and SVG (outermost, so it sees final bodies)
+app.add_middleware(compression.CompressionMiddleware)
+
+
+class _TimedTemplates(Jinja2Templates):
+    def TemplateResponse(self, *args, **kwargs):
+        with timing.span("render"):
+            return super().TemplateResponse(*args, **kwargs)
+
+
+templates = _TimedTemplates(directory="templates")
+templates.env.globals["asset"] = assets.url
+
+
+def _format_datetime(value, column=None):
+    """Format various date-like inputs to 'dd.mm.yyyy • hh:mm:ss'. Returns None if empty.
+    `column` names the source column so the shared parser can reuse its learned format.
+    """
+    try:
+        return dates.parser.format(value, column)
     except Exception:
         return None
 
 
-def _to_datetime(value):
+def _to_datetime(value, column=None):
     """Parse various date-like inputs and return a datetime or None."""
-    if value is None or value == "":
-        return None
     try:
-        # pandas Timestamp support (optional)
-        try:
-            import pandas as pd  # type: ignore
-            if isinstance(value, pd.Timestamp):
-                return value.to_pydatetime()
-        except Exception:
-            pass
-
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, str):
-            s = value.strip()
-            if s.endswith("Z"):
-                s = s[:-1] + "+00:00"
-            try:
-                return datetime.fromisoformat(s)
-            except Exception:
-                pass
-            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y"):
-                try:
-                    return datetime.strptime(s, fmt)
-                except Exception:
-                    continue
-        return None
+        return dates.parser.parse(value, column)
     except Exception:
         return None
 
 
-def _sort_df_by_datetime(df, columns=None):
+def _datetime_sort_key(s):
+    """Vectorized sort key for a date-like Series (see dates.DateParser.sort_key)."""
+    return dates.parser.sort_key(s)
+
+
+@timing.timed("sort")
+def _sort_df_by_datetime(df, columns=None, presorted=False):
     """Return a copy of df sorted by the best available datetime column (ascending).
     Tries provided columns first, then common datetime-like names. If none match,
-    returns the original df unchanged.
+    returns the original df unchanged. Unparseable dates go last.
+
+    presorted=True means the SQL already returned the rows in order (ORDER BY),
+    so the frame is returned as is.
     """
     try:
-        if df is None or getattr(df, "empty", True):
+        if df is None or getattr(df, "empty", True) or presorted:
             return df
 
         # Build case-insensitive column map
         cols_map = {str(c).lower(): c for c in getattr(df, "columns", [])}
 
         # Candidate columns to try (preference order)
-        preferred = columns or [
+        preferred = [str(c).lower() for c in columns] if columns else [
             "esdcreated",  # main document datetime in our queries
             "esucreated",
             "createdat",
@@ -143,16 +194,9 @@ def _sort_df_by_datetime(df, columns=None):
         # Try sorting by the first usable candidate
         for col in candidates:
             try:
-                # Convert values to float timestamps (None -> +inf) for safe sorting
-                def _to_ts(v):
-                    dt = _to_datetime(v)
-                    try:
-                        return dt.timestamp() if dt is not None else float("inf")
-                    except Exception:
-                        return float("inf")
-
-                sorted_df = df.sort_values(by=col, key=lambda s: s.apply(_to_ts), ascending=True, kind="mergesort")
-                return sorted_df
+                return df.sort_values(
+                    by=col, key=_datetime_sort_key, ascending=True, kind="mergesort", na_position="last"
+                )
             except Exception:
                 continue
         return df
@@ -160,6 +204,26 @@ def _sort_df_by_datetime(df, columns=None):
         return df
 
 
+@timing.timed("sort")
+def _sort_rows_by_datetime(rows, columns):
+    """List-of-rows counterpart of _sort_df_by_datetime: stable ascending sort
+    by the first of `columns` present in the rows; unparseable values go last.
+    """
+    if not rows or len(rows) == 1:
+        return rows
+    for col in columns:
+        if col in rows[0]:
+            def _to_ts(r):
+                dt = _to_datetime(r.get(col), col)
+                try:
+                    return dt.timestamp() if dt is not None else float("inf")
+                except Exception:
+                    return float("inf")
+
+            return sorted(rows, key=_to_ts)
+    return rows
+
+
 def _format_number(value):
     """Format numeric values with 2 decimals and thousand separators in Greek style (1.234,56)."""
     try:
@@ -190,6 +254,52 @@ def _normalize_url(value: str | None):
     return u
 
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@timing.timed("qr")
+def _decode_qr_png(raw):
+    """Decode a QRCode column value (bytes, data URL, base64 or hex) to PNG bytes."""
+    if raw is None or raw == "":
+        return None
+    try:
+        # bytes-like
+        if isinstance(raw, (bytes, bytearray, memoryview)):
+            b = bytes(raw)
+            return b if b[:8] == PNG_SIGNATURE else None
+        # normalize to string
+        s = str(raw).strip()
+        if s.startswith("data:"):
+            # data:image/png;base64,<payload>
+            s = s.partition(",")[2]
+        # Try base64 first
+        b = None
+        try:
+            b = base64.b64decode(s, validate=True)
+        except (binascii.Error, ValueError):
+            b = None
+        if not b:
+            # Try HEX string
+            if len(s) % 2 == 0 and re.fullmatch(r"[0-9A-Fa-f]+", s or ""):
+                try:
+                    b = bytes.fromhex(s)
+                except ValueError:
+                    b = None
+        if b and b[:8] == PNG_SIGNATURE:
+            return b
+        # Some sources store base64 without validation but still decodable
+        if s.startswith("iVBOR"):
+            # PNG base64 commonly starts with 'iVBORw0KGgo'
+            b2 = base64.b64decode(s + ("=" * ((4 - len(s) % 4) % 4)))
+            if b2[:8] == PNG_SIGNATURE:
+                return b2
+    except Exception:
+        # Silently ignore QR parsing issues
+        pass
+    return None
+
+
+@timing.timed("card")
 def build_card_context(df, document: str):
     """Builds context for the single result card and fix button state."""
     context = {
@@ -200,47 +310,57 @@ def build_card_context(df, document: str):
         "id_to_update": None,
         "status_message": None,
         "row": None,
-        "qr_data_url": None,
+        "qr_url": None,
         "result_count": None,
         "checkpoints": None,
     }
 
-    if df is None or df.empty:
+    # Accept both a DataFrame and a list of rows (fetch_data.get_sql_rows)
+    is_frame = hasattr(df, "iloc")
+    if df is None and health.is_open():
+        context["status_message"] = "The database is unreachable right now; reconnecting in the background. Please try again shortly."
+        return context
+    if df is None or (df.empty if is_frame else len(df) == 0):
         context["status_message"] = "No records were found for the given document."
         return context
 
     # Ensure consistent ordering: older first, newer last
     try:
-        df = _sort_df_by_datetime(df, columns=["ESDCreated", "ESUCreated"])  # type: ignore[arg-type]
+        if is_frame:
+            df = _sort_df_by_datetime(df, columns=["ESDCreated", "ESUCreated"])  # type: ignore[arg-type]
+        else:
+            df = _sort_rows_by_datetime(df, columns=["ESDCreated", "ESUCreated"])
     except Exception:
         pass
 
     # Keep only one card always – inspect only the first row visually
     # Drop NA values to avoid showing empty fields
-    row = df.iloc[0]
-    try:
-        row = row.dropna()
-    except Exception:
-        # If for any reason dropna isn't available, continue with the raw row
-        pass
-    row_dict = row.to_dict()
+    if is_frame:
+        row = df.iloc[0]
+        try:
+            row = row.dropna()
+        except Exception:
+            # If for any reason dropna isn't available, continue with the raw row
+            pass
+        row_dict = row.to_dict()
+        row_count = int(df.shape[0])
+    else:
+        row_dict = df[0].to_dict(dropna=True)
+        row_count = len(df)
     context["row"] = row_dict
     context["result_found"] = True
     # Total matched rows
-    try:
-        context["result_count"] = int(df.shape[0])
-    except Exception:
-        context["result_count"] = None
+    context["result_count"] = row_count
 
     # Determine if multiple rows matched
-    if df.shape[0] != 1:
+    if row_count != 1:
         context["multiple"] = True
         context["status_message"] = (
             "More than one record was found. Please refine your search."
         )
 
     # New tri-state checkpoints evaluation
-    eval_res = check.evaluate_checkpoints(df)
+    eval_res = check.evaluate_checkpoints(df, document=document)
     cp1 = eval_res.get("cp1", {"pass": False, "message": ""})
     cp2 = eval_res.get("cp2", {"pass": False, "message": ""})
     cp3 = eval_res.get("cp3", {"pass": False, "message": ""})
@@ -327,12 +447,12 @@ def build_card_context(df, document: str):
 
     user_info = [
         {"label": "User", "value": user_name, "key": "ESUCreated"},
-        {"label": "Date", "value": _format_datetime(esd_created), "key": "ESDCreated"},
+        {"label": "Date", "value": _format_datetime(esd_created, "ESDCreated"), "key": "ESDCreated"},
     ]
     # Expose date parts (day/month) for the visual date badge in User Info
     user_date = None
     try:
-        dt = _to_datetime(esd_created)
+        dt = _to_datetime(esd_created, "ESDCreated")
         if dt is not None:
             months_gr = [
                 "JAN", "FEB", "MAR", "APR", "MAY", "JUN",
@@ -347,7 +467,7 @@ def build_card_context(df, document: str):
     provider_info = [
         {"label": "Provider", "value": provider_name, "key": "ProviderName"},
         {"label": "Invoice Link", "value": invoice_raw if invoice_href else None, "href": invoice_href, "is_link": True, "key": "InvoiceURL"},
-        # QR Code rendered in template using context["qr_data_url"], but mark key as shown to avoid duplication below
+        # QR Code rendered in template from context["qr_url"], but mark key as shown to avoid duplication below
         {"label": "QR Code", "value": None, "key": "QRCode", "is_qr": True},
     ]
     # Track shown keys
@@ -466,63 +586,64 @@ def build_card_context(df, document: str):
     #     # Never allow debug printing to break the request
     #     pass
 
-    # Prepare QR image data URL if QRCode is present
-    try:
-        raw_qr = row_dict.get("QRCode") if isinstance(row_dict, dict) else None
-        data_url = None
+    # The QR image itself is served by /qr/{fDocumentGID}; the card only links to it
+    gid = row_dict.get("fDocumentGID") if isinstance(row_dict, dict) else None
+    raw_qr = row_dict.get("QRCode") if isinstance(row_dict, dict) else None
+    if gid and (row_dict.get("HasQRCode") or (raw_qr is not None and raw_qr != "")):
         if raw_qr is not None and raw_qr != "":
-            # bytes-like
-            if isinstance(raw_qr, (bytes, bytearray, memoryview)):
-                b = bytes(raw_qr)
-                # validate PNG signature
-                if len(b) >= 8 and b[:8] == b"\x89PNG\r\n\x1a\n":
-                    data_url = "data:image/png;base64," + base64.b64encode(b).decode("ascii")
-            else:
-                # normalize to string
-                s = str(raw_qr).strip()
-                if s.startswith("data:"):
-                    # assume already a valid data URL
-                    data_url = s
-                else:
-                    # Try base64 first
-                    b = None
-                    try:
-                        b = base64.b64decode(s, validate=True)
-                    except (binascii.Error, ValueError):
-                        b = None
-                    if not b:
-                        # Try HEX string
-                        if len(s) % 2 == 0 and re.fullmatch(r"[0-9A-Fa-f]+", s or ""):
-                            try:
-                                b = bytes.fromhex(s)
-                            except ValueError:
-                                b = None
-                    if b and len(b) >= 8 and b[:8] == b"\x89PNG\r\n\x1a\n":
-                        data_url = "data:image/png;base64," + base64.b64encode(b).decode("ascii")
-                    # Some sources store base64 without validation but still decodable
-                    elif s.startswith("iVBOR"):
-                        # PNG base64 commonly starts with 'iVBORw0KGgo'
-                        try:
-                            b2 = base64.b64decode(s + ("=" * ((4 - len(s) % 4) % 4)))
-                            if len(b2) >= 8 and b2[:8] == b"\x89PNG\r\n\x1a\n":
-                                data_url = "data:image/png;base64," + base64.b64encode(b2).decode("ascii")
-                        except Exception:
-                            pass
-        context["qr_data_url"] = data_url
-    except Exception:
-        # Silently ignore QR parsing issues
-        context["qr_data_url"] = None
+            # Rows that already carry the blob prime the image cache
+            png = _decode_qr_png(raw_qr)
+            if png is not None:
+                _qr_cache.set(str(gid), png)
+        context["qr_url"] = f"/qr/{quote(str(gid), safe='')}"
+    add_shown("HasQRCode")
 
     return context
 
 
+def _card_cache_key(rows, document):
+    """Cache key for the rendered card of a single-row lookup, else None.
+
+    The GID identifies the document; the fingerprint covers the fields a fix
+    or a resend changes (Status, StatusText, MarkID) and the code as typed,
+    which ends up in the Fix form.
+    """
+    if rows is None or check.row_count(rows) != 1:
+        return None
+    row = check.first_row(rows)
+    gid = check.row_field(row, "fDocumentGID")
+    if gid is None:
+        return None
+    state = (check.row_field(row, "Status"), check.row_field(row, "StatusText"), check.row_field(row, "MarkID"), document)
+    fingerprint = hashlib.sha256(repr(state).encode("utf-8")).hexdigest()[:16]
+    return f"{gid}:{fingerprint}"
+
+
+def _card_html(rows, document):
+    """Rendered _card.html for the check.sql rows of `document`.
+
+    An unchanged document is served from _card_cache, skipping both
+    build_card_context and Jinja.
+    """
+    key = _card_cache_key(rows, document)
+    if key is not None:
+        html = _card_cache.get(key)
+        if html is not None:
+            return Markup(html.decode("utf-8"))
+    card = build_card_context(rows, document)
+    with timing.span("render"):
+        html = templates.get_template("_card.html").render(card=card)
+    if key is not None:
+        _card_cache.set(key, html.encode("utf-8"))
+    return Markup(html)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "logo_url": "/images/SOFTONE-EINVOICING.svg",
             "card": None,
             "message": None,
             "auto_results": None,
@@ -533,41 +654,80 @@ async def index(request: Request):
 @app.post("/search", response_class=HTMLResponse)
 async def search(request: Request, document: str = Form(...)):
     params = {"document": document}
-    df = fetch_data.get_sql_data(SQL_FILES["check"], params)
-    card = build_card_context(df, document)
-    # Keep auto search results visible after selecting a document
-    df_auto = fetch_data.get_sql_data(SQL_FILES["auto"])
-    auto_results = _extract_documents_list(df_auto)
+    # Document lookup and candidate list are independent: run them concurrently
+    # (keeps auto search results visible after selecting a document)
+    df, auto_page = await asyncio.gather(
+        executor.run(fetch_data.get_sql_rows, SQL_FILES["check"], params),
+        _get_candidate_page(),
+    )
 
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "logo_url": "/images/SOFTONE-EINVOICING.svg",
-            "card": card,
+            "document": document,
+            "card_html": _card_html(df, document),
             "message": None,
-            "auto_results": auto_results,
+            "auto_results": auto_page["items"],
+            "auto_page": auto_page,
         },
     )
 
 
-@app.post("/fix", response_class=HTMLResponse)
-async def fix(request: Request, document: str = Form(...)):
-    # Re-run search and validation server-side
+# Special case: AADE IssueDate validation error can be fixed with a different SQL
+SPECIAL_ERROR = "Aade Validation Error: IssueDate is invalid, it must be equal with current date"
+WRONG_LOGIN_DAY_HINT = "να γίνει ενημέρωση offline συναλλαγών"
+
+
+def _plan_fix(status_text, cp1_pass, cp3_pass, can_fix, id_to_update):
+    """Choose the UPDATE for one document from its checkpoint outcome.
+    Returns (sql_file, post_success_hint); sql_file is None if no fix applies.
+    """
+    status_text = str(status_text).strip() if status_text is not None else None
+    if status_text == SPECIAL_ERROR and cp1_pass and cp3_pass and id_to_update:
+        # Use the dedicated update for wrong login day / issue date
+        return SQL_FILES["update_wrong_login_day"], WRONG_LOGIN_DAY_HINT
+    if can_fix and id_to_update:
+        # Fallback to normal set.sql
+        return SQL_FILES["set"], None
+    return None, None
+
+
+async def _on_fixed(*documents):
+    # The fixed document changes status: drop the cached candidate list
+    # (here and, through the shared cache, in every other worker) and let
+    # live browsers see the change without waiting for the poller
+    _auto_cache.invalidate()
+    if shared_cache.enabled():
+        # SQLite write with a busy timeout: keep it off the event loop, and
+        # finish it before the caller re-reads the document
+        await executor.run(shared_cache.bump, CANDIDATES_TAG, *(shared_cache.document_tag(d) for d in documents))
+    candidate_feed.poke()
+
+
+def _success_message(card, affected, post_success_hint):
+    message = f"Update completed successfully (affected: {affected})."
+    if post_success_hint:
+        # Surface the requested hint prominently in the card status area
+        existing = card.get("status_message")
+        card["status_message"] = (
+            f"{existing} — {post_success_hint}" if existing else post_success_hint
+        )
+        # Also show as popup/alert message
+        message = f"{message} — {post_success_hint}"
+    return message
+
+
+async def _apply_fix_classic(document):
+    """Read, evaluate checkpoints in Python, UPDATE by GID, read again."""
     params = {"document": document}
-    df = fetch_data.get_sql_data(SQL_FILES["check"], params)
+    # The UPDATE by GID is unguarded: decide on the live row, never a shared-cache copy
+    df = await executor.run(fetch_data.get_sql_rows, SQL_FILES["check"], params, cache=False)
     card = build_card_context(df, document)
 
-    # Default values
-    message = None
-    affected = 0
-
-    # Special case: AADE IssueDate validation error can be fixed with a different SQL
-    special_error = "Aade Validation Error: IssueDate is invalid, it must be equal with current date"
     status_text = None
     try:
         status_text = (card.get("row") or {}).get("StatusText")
-        status_text = str(status_text).strip() if status_text is not None else None
     except Exception:
         status_text = None
 
@@ -577,86 +737,246 @@ async def fix(request: Request, document: str = Form(...)):
     cp3_pass = bool(cp_list[2]["pass"]) if len(cp_list) >= 3 else False
 
     # Decide which SQL to use
-    sql_to_use = None
-    post_success_hint = None
-    if (
-        status_text == special_error
-        and cp1_pass
-        and cp3_pass
-        and card.get("id_to_update")
-    ):
-        # Use the dedicated update for wrong login day / issue date
-        sql_to_use = SQL_FILES["update_wrong_login_day"]
-        post_success_hint = "να γίνει ενημέρωση offline συναλλαγών"
-    elif card.get("can_fix") and card.get("id_to_update"):
-        # Fallback to normal set.sql
-        sql_to_use = SQL_FILES["set"]
-
-    if sql_to_use and card.get("id_to_update"):
-        affected = sql_set.update(card["id_to_update"], sql_to_use)
-        if affected:
-            message = f"Update completed successfully (affected: {affected})."
-            if post_success_hint:
-                # Surface the requested hint prominently in the card status area
-                existing = card.get("status_message")
-                hint_msg = post_success_hint
-                card["status_message"] = (
-                    f"{existing} — {hint_msg}" if existing else hint_msg
-                )
-                # Also show as popup/alert message
-                message = f"{message} — {post_success_hint}"
-            # Re-fetch to reflect new status after update
-            df_after = fetch_data.get_sql_data(SQL_FILES["check"], params)
-            card = build_card_context(df_after, document)
-        else:
+    sql_to_use, post_success_hint = _plan_fix(
+        status_text, cp1_pass, cp3_pass, card.get("can_fix"), card.get("id_to_update")
+    )
+
+    if not (sql_to_use and card.get("id_to_update")):
+        return {"card": card, "message": "Fix is not possible for the current result.", "auto_page": None}
+
+    affected = await executor.run(sql_set.update, card["id_to_update"], sql_to_use, document=document)
+    if not affected:
+        return {"card": card, "message": "Update failed. Please try again.", "auto_page": None}
+
+    await _on_fixed(document)
+    # Re-fetch to reflect new status after update, together with the
+    # (now invalidated) candidate list
+    df_after, auto_page = await asyncio.gather(
+        executor.run(fetch_data.get_sql_rows, SQL_FILES["check"], params),
+        _get_candidate_page(),
+    )
+    card = build_card_context(df_after, document)
+    message = _success_message(card, affected, post_success_hint)
+    return {"card": card, "message": message, "auto_page": auto_page}
+
+
+def _cas_params(document):
+    params = {"document": document}
+    for i, marker in enumerate(check.SUCCESS_MARKERS, 1):
+        params[f"success_{i}"] = f"%{marker}%"
+    return params
+
+
+async def _apply_fix_cas(document):
+    """One guarded UPDATE ... OUTPUT: checks and fixes in a single round trip.
+    Only when nothing was updated is the document read to explain why.
+    """
+    start = time.perf_counter()
+    updated = await executor.run(update.execute_sql_returning, SQL_FILES["fix_cas"], _cas_params(document))
+    audit.event(
+        "fix",
+        mode="cas",
+        document=document,
+        gid=updated[0].get("fDocumentGID") if updated else None,
+        sql_file=SQL_FILES["fix_cas"],
+        affected=len(updated) if updated is not None else None,
+        duration_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+    if not updated:
+        df = await executor.run(fetch_data.get_sql_rows, SQL_FILES["check"], {"document": document}, cache=False)
+        card = build_card_context(df, document)
+        if updated is None:
             message = "Update failed. Please try again."
+        else:
+            message = "Fix is not possible for the current result."
+        return {"card": card, "message": message, "auto_page": None}
+
+    await _on_fixed(document)
+    card = build_card_context(updated, document)
+    message = _success_message(card, len(updated), None)
+    return {"card": card, "message": message, "auto_page": await _get_candidate_page()}
+
+
+# In-flight fixes per document: a second /fix for the same document waits for
+# the running one and shares its outcome instead of racing it
+_fix_inflight = {}
+
+
+async def _coalesced_fix(document):
+    # SQL Server matches ADCode case-insensitively: " doc-1" and "DOC-1" are one row
+    key = shared_cache.document_tag(document)
+    task = _fix_inflight.get(key)
+    if task is None:
+        apply = _apply_fix_cas if FIX_MODE == "cas" else _apply_fix_classic
+        task = asyncio.ensure_future(apply(document))
+        _fix_inflight[key] = task
+
+        def _done(t):
+            if _fix_inflight.get(key) is t:
+                del _fix_inflight[key]
+
+        task.add_done_callback(_done)
+    # shield: a client disconnecting must not cancel a fix others are waiting on
+    return await asyncio.shield(task)
+
+
+@app.post("/fix", response_class=HTMLResponse)
+async def fix(request: Request, document: str = Form(...)):
+    # Validation runs server-side again (see FIX_MODE); the candidate list is
+    # fetched alongside and only re-fetched if the update changed it
+    document = document.strip()
+    auto_page_task = asyncio.ensure_future(_get_candidate_page())
+    result = await _coalesced_fix(document)
+    auto_page = result["auto_page"]
+    if auto_page is None:
+        auto_page = await auto_page_task
     else:
-        message = "Fix is not possible for the current result."
+        # The list fetched before the update is stale; the fix re-fetched it
+        auto_page_task.cancel()
 
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "logo_url": "/images/SOFTONE-EINVOICING.svg",
-            "card": card,
-            "message": message,
-            # Keep auto search results visible after fix
-            "auto_results": _extract_documents_list(fetch_data.get_sql_data(SQL_FILES["auto"])),
+            "card": result["card"],
+            "message": result["message"],
+            "auto_results": auto_page["items"],
+            "auto_page": auto_page,
         },
     )
 
 
+class BatchFixRequest(BaseModel):
+    documents: list[str]
+
+
+def _run_batch_fix(documents):
+    """Blocking part of /api/fix/batch: one lookup query for every document,
+    checkpoint evaluation per document, then all UPDATEs in one transaction.
+    """
+    rows = fetch_data.get_sql_rows(SQL_FILES["check_many"], {"documents": documents})
+    if rows is None:
+        return None
+
+    by_document = {}
+    for r in rows:
+        by_document.setdefault(shared_cache.document_tag(r.get("ADCode") or ""), []).append(r)
+
+    results = []
+    statements = []
+    for document in documents:
+        # adcode = :document is case-insensitive on SQL Server: match the same way
+        doc_rows = by_document.get(shared_cache.document_tag(document), [])
+        if not doc_rows:
+            results.append({"document": document, "gid": None, "affected": 0, "sql_file": None,
+                            "status": "not_found", "message": "No records were found for the given document."})
+            continue
+        eval_res = check.evaluate_checkpoints(doc_rows, document=document)
+        all_pass = bool(eval_res.get("all_pass"))
+        id_to_update = eval_res.get("unique_id") if all_pass else None
+        sql_file, hint = _plan_fix(
+            check.row_field(doc_rows[0], "StatusText"),
+            eval_res["cp1"]["pass"],
+            eval_res["cp3"]["pass"],
+            all_pass,
+            id_to_update,
+        )
+        result = {"document": document, "gid": eval_res.get("unique_id"), "affected": 0, "sql_file": sql_file}
+        if sql_file is None:
+            first_fail = next((eval_res[cp]["message"] for cp in ("cp1", "cp2", "cp3") if not eval_res[cp]["pass"]), None)
+            result.update(status="skipped", message=first_fail or "Fix is not possible for the current result.")
+        else:
+            result.update(status="pending", message=hint)
+            statements.append((sql_file, {"unique_id": id_to_update}))
+        results.append(result)
+
+    start = time.perf_counter()
+    counts = update.execute_many(statements) if statements else []
+    duration_ms = round((time.perf_counter() - start) * 1000, 1)
+    pending = [r for r in results if r["status"] == "pending"]
+    for result, affected in zip(pending, counts or [None] * len(pending)):
+        if affected is None:
+            result.update(status="failed", message="Batch transaction failed and was rolled back.")
+        else:
+            result.update(status="updated" if affected else "unchanged", affected=affected)
+        audit.event(
+            "fix",
+            mode="batch",
+            document=result["document"],
+            gid=result["gid"],
+            sql_file=result["sql_file"],
+            status=result["status"],
+            affected=result["affected"],
+            duration_ms=duration_ms,
+        )
+    return results
+
+
+@app.post("/api/fix/batch")
+async def api_fix_batch(payload: BatchFixRequest):
+    """Validate and fix many documents: one lookup query, one UPDATE transaction."""
+    # Normalize and de-duplicate (case-insensitively, like ADCode matching)
+    # while keeping the caller's order and first spelling
+    unique = {}
+    for d in payload.documents:
+        if d and d.strip():
+            unique.setdefault(shared_cache.document_tag(d), d.strip())
+    documents = list(unique.values())
+    if len(documents) > BATCH_FIX_MAX:
+        return Response(
+            content=_dumps({"detail": f"Too many documents: {len(documents)} sent, at most {BATCH_FIX_MAX} per batch."}),
+            media_type="application/json",
+            status_code=422,
+        )
+    if not documents:
+        return Response(content=_dumps({"results": [], "updated": 0}), media_type="application/json")
+
+    results = await executor.run(_run_batch_fix, documents)
+    if results is None:
+        return _query_failed()
+    updated = sum(r["affected"] for r in results)
+    if updated:
+        await _on_fixed(*(r["document"] for r in results if r["affected"]))
+    return Response(content=_dumps({"results": results, "updated": updated}), media_type="application/json")
+
+
 @app.get("/search/{document}", response_class=HTMLResponse)
-async def search_get(request: Request, document: str):
+async def search_get(request: Request, document: str, cursor: str | None = None):
     params = {"document": document}
-    df = fetch_data.get_sql_data(SQL_FILES["check"], params)
-    card = build_card_context(df, document)
-    # Keep auto search results visible while viewing a selected document
-    df_auto = fetch_data.get_sql_data(SQL_FILES["auto"])
-    auto_results = _extract_documents_list(df_auto)
+    # Document lookup and candidate list are independent: run them concurrently
+    # (keeps auto search results visible while viewing a selected document)
+    df, auto_page = await asyncio.gather(
+        executor.run(fetch_data.get_sql_rows, SQL_FILES["check"], params),
+        _get_candidate_page(cursor),
+    )
 
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "logo_url": "/images/SOFTONE-EINVOICING.svg",
-            "card": card,
+            "document": document,
+            "card_html": _card_html(df, document),
             "message": None,
-            "auto_results": auto_results,
+            "auto_results": auto_page["items"],
+            "auto_page": auto_page,
         },
     )
 
 
-def _extract_documents_list(df):
+@timing.timed("candidates")
+def _extract_documents_list(df, presorted=False):
     """Return a list of document codes (adcode) from auto.sql results.
     Tries common column name variants and ensures uniqueness while keeping order.
+    Each entry carries `fix_ready` (all checkpoints pass, see
+    check.evaluate_checkpoints_frame) so the list can flag fixable documents.
+    Pass presorted=True when the query already ordered the rows (ORDER BY).
     """
     results = []
     if df is None or df.empty:
         return results
     # Sort by datetime so that the resulting list is oldest-first
     try:
-        df = _sort_df_by_datetime(df, columns=["ESDCreated", "ESUCreated"])  # type: ignore[arg-type]
+        df = _sort_df_by_datetime(df, columns=["ESDCreated", "ESUCreated"], presorted=presorted)  # type: ignore[arg-type]
     except Exception:
         pass
     cols = {c.lower(): c for c in df.columns}
@@ -680,48 +1000,331 @@ def _extract_documents_list(df):
             break
     if not ad_col:
         return results
-    seen = set()
-    # Iterate rows to carry both document and status forward
-    for _, row in df.iterrows():
+    pd = sys.modules["pandas"]  # a DataFrame implies pandas is loaded
+    # Fix-readiness (all three checkpoints) for every row in one vectorized pass
+    try:
+        fix_ready = check.evaluate_checkpoints_frame(df, document_col=ad_col)["all_pass"]
+    except Exception:
+        fix_ready = pd.Series(False, index=df.index)
+
+    # Columnar pipeline: normalize ADCode, coerce Status, keep the first row
+    # of every document in the current (date) order
+    docs = df[ad_col].astype("string").str.strip().fillna("")
+    if status_col:
+        raw_status = df[status_col]
+        if not pd.api.types.is_numeric_dtype(raw_status):
+            raw_status = raw_status.astype("string").str.strip()
+        status = pd.to_numeric(raw_status, errors="coerce")
+        # Only whole numbers are statuses; anything else is unknown (None)
+        status = status.where(status.eq(status.round()))
+    else:
+        status = pd.Series(float("nan"), index=df.index)
+    work = pd.DataFrame(
+        {"document": docs.to_numpy(), "status": status.to_numpy(), "fix_ready": fix_ready.to_numpy(dtype=bool)}
+    )
+    work = work[work["document"] != ""].drop_duplicates(subset="document", keep="first")
+    for doc, st, ready in zip(work["document"].tolist(), work["status"].tolist(), work["fix_ready"].tolist()):
+        results.append({"document": doc, "status": None if st != st else int(st), "fix_ready": bool(ready)})
+    return results
+
+
+def _encode_cursor(created, gid):
+    """Opaque keyset cursor for the candidate list: (ESDCreated, fDocumentGID)."""
+    if hasattr(created, "to_pydatetime"):
+        created = created.to_pydatetime()
+    if isinstance(created, datetime):
+        created = created.isoformat()
+    raw = json.dumps([str(created), str(gid)]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """Return (after_created, after_gid) or (None, None) for a missing/invalid cursor."""
+    if not cursor:
+        return None, None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created, gid = json.loads(raw.decode("utf-8"))
+        return datetime.fromisoformat(created), str(gid)
+    except Exception:
+        return None, None
+
+
+def _load_candidate_page(cursor=None):
+    """Run auto_page.sql for one keyset page of candidates.
+    Returns {"items", "cursor", "next_cursor"} or None on query failure.
+    """
+    after_created, after_gid = _decode_cursor(cursor)
+    if after_created is None:
+        cursor = None
+    params = {
+        "page_size": CANDIDATE_PAGE_SIZE,
+        # Whole minutes keep the parameters (and the shared cache key) stable
+        "since": (datetime.now() - timedelta(days=CANDIDATE_LOOKBACK_DAYS)).replace(second=0, microsecond=0),
+        "after_created": after_created,
+        "after_gid": after_gid,
+    }
+    df = fetch_data.get_sql_data(SQL_FILES["auto_page"], params)
+    if df is None:
+        return None
+    next_cursor = None
+    # WITH TIES may return more than page_size rows; fewer means last page
+    if len(df.index) >= CANDIDATE_PAGE_SIZE:
+        last = df.iloc[-1]
+        next_cursor = _encode_cursor(last["ESDCreated"], last["fDocumentGID"])
+    return {
+        # auto_page.sql orders by ESDCreated, GID: no need to re-sort in Python
+        "items": _extract_documents_list(df, presorted=True),
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+    }
+
+
+def _stale_candidate_page(key, cursor):
+    """Last known page for `key`, marked stale (used when the query cannot run)."""
+    page, age = _auto_cache.peek(key)
+    if page is None:
+        return {"items": [], "cursor": cursor, "next_cursor": None, "stale": True, "stale_age": None}
+    return {**page, "stale": True, "stale_age": int(age)}
+
+
+async def _get_candidate_page(cursor=None):
+    """One page of the candidate side list, served from the TTL cache.
+    While the DB is unreachable the last known snapshot is served, marked stale.
+    """
+    if _decode_cursor(cursor)[0] is None:
+        # A missing or undecodable cursor is page 1: share its cache entry
+        cursor = None
+    key = ("auto", cursor)
+    if health.is_open():
+        return _stale_candidate_page(key, cursor)
+    if shared_cache.enabled() and await executor.run(shared_cache.changed, CANDIDATES_TAG):
+        # Another worker applied a fix: its list is newer than ours
+        _auto_cache.invalidate()
+    page = await _auto_cache.aget(key, lambda: _load_candidate_page(cursor))
+    if page is None:
+        return _stale_candidate_page(key, cursor)
+    return page
+
+
+async def _poll_candidates():
+    """Feed loader: one fresh query for the first page, which also re-warms the cache."""
+    if health.is_open():
+        # Nothing to poll; keep the last snapshot until the monitor reconnects
+        return None
+    page = await executor.run(_load_candidate_page)
+    if page is None:
+        return None
+    _auto_cache.set(("auto", None), page)
+    return page["items"]
+
+
+# One poller for all connected browsers (see events.CandidateFeed)
+candidate_feed = events.CandidateFeed(
+    _poll_candidates,
+    interval=_env_float("CANDIDATE_FEED_INTERVAL", 15.0),
+)
+
+
+@app.get("/events/candidates")
+async def candidate_events(request: Request):
+    """SSE stream of the first candidate page: a snapshot, then added/removed entries."""
+    keepalive = 20.0
+
+    async def stream():
+        q = candidate_feed.subscribe()
         try:
-            raw_doc = row.get(ad_col) if isinstance(row, dict) else row[ad_col]
-        except Exception:
-            raw_doc = None
-        doc = str(raw_doc).strip() if raw_doc is not None else ""
-        if not doc or doc in seen:
-            continue
-        seen.add(doc)
-        # Extract status
-        status_val = None
-        if status_col:
-            try:
-                raw_status = row.get(status_col) if isinstance(row, dict) else row[status_col]
-            except Exception:
-                raw_status = None
-            if raw_status is not None and str(raw_status).strip() != "":
+            yield f"retry: {int(candidate_feed.interval * 1000)}\n\n"
+            while True:
                 try:
-                    status_val = int(str(raw_status).strip())
-                except Exception:
-                    # keep as None if unparsable
-                    status_val = None
-        results.append({"document": doc, "status": status_val})
-    return results
+                    event, data = await asyncio.wait_for(q.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield events.format_event(event, data)
+        finally:
+            candidate_feed.unsubscribe(q)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _json_default(value):
+    """json.dumps fallback for DB values (datetimes, decimals, blobs, pandas scalars)."""
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    if hasattr(value, "item"):
+        # numpy scalar
+        return value.item()
+    return str(value)
+
+
+def _dumps(payload):
+    return json.dumps(payload, default=_json_default, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _query_failed():
+    """503 for API callers; tells them when to retry while the DB is down."""
+    if health.is_open():
+        return Response(
+            content=_dumps({"detail": "Database unreachable", "health": health.status()}),
+            media_type="application/json",
+            status_code=503,
+            headers={"Retry-After": str(max(1, math.ceil(health.status()["next_probe_in"] or 0)))},
+        )
+    return Response(
+        content=_dumps({"detail": "Query failed"}),
+        media_type="application/json",
+        status_code=503,
+    )
+
+
+def _etag(*parts):
+    """Strong ETag over the given JSON-able parts."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(_dumps(part))
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def _etag_matches(request: Request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison: W/"x" (as sent back after
+    # compression, see compression.py) matches "x"
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _json_with_etag(payload, etag):
+    return Response(
+        content=_dumps(payload),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/api/documents/{document}")
+async def api_document(request: Request, document: str):
+    """Card context for one document as JSON; 304 if the rows did not change."""
+    rows = await executor.run(fetch_data.get_sql_rows, SQL_FILES["check"], {"document": document})
+    if rows is None:
+        return _query_failed()
+    # The ETag depends only on the raw rows, so a conditional GET that matches
+    # skips building the card entirely
+    etag = _etag(document, [r.items() for r in rows])
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return _json_with_etag(build_card_context(rows, document), etag)
+
+
+@app.get("/health")
+async def health_check():
+    """Circuit breaker state; 503 while the database is unreachable."""
+    return Response(
+        content=_dumps(health.status()),
+        media_type="application/json",
+        status_code=503 if health.is_open() else 200,
+    )
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape endpoint: SQL latency/rows per file, pool and breaker gauges."""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/metrics/slow")
+async def slow_queries():
+    """Recent statements slower than SLOW_QUERY_MS, newest first."""
+    return Response(content=_dumps({"threshold_ms": metrics.SLOW_QUERY_MS, "queries": metrics.slow_queries()}),
+                    media_type="application/json")
+
+
+@app.get("/api/candidates")
+async def api_candidates(request: Request, cursor: str | None = None):
+    """One page of the candidate list as JSON, with the cursor of the next page."""
+    page = await _get_candidate_page(cursor)
+    etag = _etag(page)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return _json_with_etag(page, etag)
+
+
+def _load_qr_png(gid):
+    rows = fetch_data.get_sql_rows(SQL_FILES["qr"], {"gid": gid})
+    if not rows:
+        return None
+    return _decode_qr_png(rows[0]["QRCode"])
+
+
+@app.get("/qr/{gid}")
+async def qr_image(request: Request, gid: str):
+    """Decoded QR PNG of one document; the image never changes, so browsers keep it."""
+    png = _qr_cache.get(gid)
+    if png is None:
+        png = await executor.run(_load_qr_png, gid)
+        if png is None:
+            return Response(status_code=404)
+        _qr_cache.set(gid, png)
+    etag = f'"{hashlib.sha256(png).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=png, media_type="image/png", headers=headers)
+
+
+@app.get("/fragments/card/{document}", response_class=HTMLResponse)
+async def card_fragment(document: str):
+    """Only the result card section, for swapping it into the page in place."""
+    rows = await executor.run(fetch_data.get_sql_rows, SQL_FILES["check"], {"document": document})
+    return HTMLResponse(_card_html(rows, document))
+
+
+@app.get("/fragments/candidates", response_class=HTMLResponse)
+async def candidates_fragment(request: Request, cursor: str | None = None, refresh: bool = False):
+    """Only the candidate list section; refresh=1 re-runs the discovery SQL like /refresh."""
+    if refresh and not cursor:
+        _auto_cache.invalidate()
+    auto_page = await _get_candidate_page(cursor)
+    return templates.TemplateResponse(
+        "_candidates.html",
+        {"request": request, "auto_results": auto_page["items"], "auto_page": auto_page},
+    )
 
 
 @app.get("/refresh", response_class=HTMLResponse)
-async def refresh(request: Request):
-    # Run the auto discovery SQL to find candidate documents
-    df = fetch_data.get_sql_data(SQL_FILES["auto"])
-    auto_results = _extract_documents_list(df)
+async def refresh(request: Request, cursor: str | None = None):
+    # Explicit refresh (first page): re-run the auto discovery SQL for every
+    # cached page; with a cursor this pages through the cached candidates
+    if not cursor:
+        _auto_cache.invalidate()
+    auto_page = await _get_candidate_page(cursor)
 
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "logo_url": "/images/SOFTONE-EINVOICING.svg",
             "card": None,
             "message": None,
-            "auto_results": auto_results,
+            "auto_results": auto_page["items"],
+            "auto_page": auto_page,
         },
     )
 def get_ip_address():
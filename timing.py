@@ -0,0 +1,131 @@
+"""Per-request timing breakdown (Server-Timing header).
+
+`ServerTimingMiddleware` gives every HTTP request an empty span list in a
+context variable. Code on the request path records stages into it with
+`span("name")`, `@timed("name")` or `add()`; work handed to the DB executor
+is included because `SQL.executor.run` copies the context. When the response
+starts, the spans are summed per (name, desc) and sent as
+
+    Server-Timing: sql;desc="check.sql";dur=4.2, card;dur=0.8, render;dur=3.1, total;dur=9.5
+
+which browser devtools show under Timing. With TIMING_LOG=1 one JSON log line
+per request is written as well. SERVER_TIMING=0 turns the header off.
+Outside a request (background polls, cache refreshes) spans are dropped.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+_spans = contextvars.ContextVar("timing_spans", default=None)
+
+logger = logging.getLogger("ecos.timing")
+
+
+def _env_bool(name, default):
+    v = os.getenv(name)
+    if v is None or str(v).strip() == "":
+        return default
+    return str(v).strip().lower() in {"1", "yes", "true", "on"}
+
+
+def add(name, seconds, desc=None):
+    """Record a finished stage on the current request (no-op outside one)."""
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, seconds, desc))
+
+
+@contextmanager
+def span(name, desc=None):
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, time.perf_counter() - start, desc))
+
+
+def timed(name):
+    """Decorator form of `span` for synchronous functions."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize(spans):
+    """{(name, desc): [total_seconds, count]} in first-seen order."""
+    totals = {}
+    for name, seconds, desc in spans:
+        entry = totals.setdefault((name, desc), [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    return totals
+
+
+def format_header(spans, total):
+    parts = []
+    for (name, desc), (seconds, _) in summarize(spans).items():
+        part = name
+        if desc:
+            part += ';desc="' + str(desc).replace('"', "'") + '"'
+        parts.append(f"{part};dur={seconds * 1000:.1f}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware, so streaming responses (SSE) pass through untouched."""
+
+    def __init__(self, app, header=None, log=None):
+        self.app = app
+        self.header = _env_bool("SERVER_TIMING", True) if header is None else header
+        self.log = _env_bool("TIMING_LOG", False) if log is None else log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self.header or self.log):
+            await self.app(scope, receive, send)
+            return
+
+        spans = []
+        token = _spans.set(spans)
+        start = time.perf_counter()
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    value = format_header(spans, time.perf_counter() - start)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", value.encode("latin-1", "replace")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _spans.reset(token)
+            if self.log:
+                logger.info(json.dumps({
+                    "method": scope.get("method"),
+                    "path": scope.get("path"),
+                    "status": status,
+                    "total_ms": round((time.perf_counter() - start) * 1000, 1),
+                    "spans": {
+                        (f"{name}:{desc}" if desc else name): {"ms": round(seconds * 1000, 1), "count": count}
+                        for (name, desc), (seconds, count) in summarize(spans).items()
+                    },
+                }, ensure_ascii=False))
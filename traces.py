@@ -0,0 +1,104 @@
+"""Anonymized request trace recorder (input for benchmarks/loadtest.py).
+
+With TRACE_FILE set, `TraceRecorderMiddleware` appends one JSON line per
+request:
+
+    {"ts": 1760000000.123, "method": "POST", "route": "/fix",
+     "params": {"document": "d_3f2a9c0e51b7"}, "cursor": false, "status": 200, "ms": 41.7}
+
+`route` is the route template (e.g. /search/{document}), never the raw path.
+Document codes and GIDs, from path parameters or the `document` form field,
+are replaced by a keyed hash of the stripped, upper-cased value (SQL Server
+matches ADCode case-insensitively), so the same document always gets the same
+token and replays keep the access pattern, but codes cannot be read back.
+TRACE_SALT fixes the key across restarts (default: random per process).
+Static files, images and the SSE stream are not recorded. Records are written
+by a background thread (SQL/audit.py's AuditLog), never on the event loop.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from urllib.parse import parse_qs
+
+from SQL import audit
+
+SKIP_PREFIXES = ("/static/", "/images/", "/events/")
+# Request bodies larger than this are not inspected for a document field
+MAX_FORM_BYTES = 16 * 1024
+
+
+def anonymize(value, key):
+    digest = hmac.new(key, str(value).strip().upper().encode("utf-8"), hashlib.sha256).hexdigest()
+    return "d_" + digest[:12]
+
+
+# Writers of every recorder, flushed by close() on shutdown
+_logs = []
+
+
+def close():
+    for log in _logs:
+        log.close()
+
+
+class TraceRecorderMiddleware:
+    def __init__(self, app, path=None, salt=None):
+        self.app = app
+        self.path = os.getenv("TRACE_FILE") if path is None else path
+        salt = os.getenv("TRACE_SALT") if salt is None else salt
+        self.key = salt.encode("utf-8") if salt else secrets.token_bytes(32)
+        self._log = audit.AuditLog(self.path) if self.path else None
+        if self._log is not None:
+            _logs.append(self._log)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if not self.path or scope["type"] != "http" or path.startswith(SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        is_form = any(
+            k == b"content-type" and v.startswith(b"application/x-www-form-urlencoded")
+            for k, v in scope.get("headers", [])
+        )
+
+        async def receive_and_keep():
+            message = await receive()
+            if is_form and message["type"] == "http.request" and len(body) < MAX_FORM_BYTES:
+                body.extend(message.get("body", b""))
+            return message
+
+        status = None
+
+        async def send_and_watch(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        ts = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_and_keep, send_and_watch)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            params = {k: anonymize(v, self.key) for k, v in (scope.get("path_params") or {}).items()}
+            if body:
+                document = parse_qs(body.decode("utf-8", "replace")).get("document")
+                if document:
+                    params["document"] = anonymize(document[0], self.key)
+            self._log.write({
+                "ts": round(ts, 3),
+                "method": scope.get("method"),
+                # Unmatched paths may contain anything: keep only the fact
+                "route": getattr(route, "path", None) or "<unmatched>",
+                "params": params,
+                "cursor": b"cursor=" in scope.get("query_string", b""),
+                "status": status,
+                "ms": round(elapsed * 1000, 1),
+            })